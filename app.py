@@ -1,37 +1,64 @@
 import streamlit as st
 import pandas as pd
 import uuid
+from pathlib import Path
 
-from core.loader import load_csv_smart
-from core.profiler import make_quality_metrics, basic_summary
+from core.store import DatasetStore
+from core.export import EXPORT_FORMATS, export_frame
+from core.streaming import profile_csv_stream
+from core.profiler import DatasetProfile, profile_dataset
+from core.fingerprint import fingerprint, set_fingerprint
 from core.visuals import render_visuals, build_report_figures
-from core.insights import generate_auto_insights
-from core.cleaning import clean_dataset, cleaning_plan_from_df
+from core.insights import insights_from_profile
+from core.cleaning import CleaningPlan, cleaning_plan_from_df
 from core.report import build_html_report, build_pdf_report
 
 
 # ----------------------------
 # Cache pesado (ganho grande)
 # ----------------------------
-@st.cache_data(show_spinner=False)
-def cached_load_csv(file) -> tuple[pd.DataFrame, dict]:
-    # Cacheia leitura/parsing do CSV
-    return load_csv_smart(file)
+@st.cache_resource(show_spinner=False)
+def get_dataset_store() -> DatasetStore:
+    # Cache em disco (Arrow) compartilhado entre sessões e restarts
+    return DatasetStore()
 
 
-@st.cache_data(show_spinner=False)
-def cached_quality(df: pd.DataFrame):
-    return make_quality_metrics(df)
+# Frames ficam em cache_resource (mesmo objeto a cada rerun, sem cópia/hash do DataFrame)
+# e são chaveados pelo file_id do upload; parâmetros com "_" não entram no hash.
+@st.cache_resource(show_spinner=False, max_entries=8)
+def cached_load_csv(file_id: str, _file, optimize: bool = False) -> tuple[pd.DataFrame, dict]:
+    # Cacheia leitura/parsing do CSV; uploads repetidos caem no DatasetStore
+    df, meta = get_dataset_store().load_csv(_file, optimize=optimize)
+    # identidade do dataset = hash do CSV bruto (já calculado pelo store)
+    set_fingerprint(df, meta["content_key"] + ("-opt" if optimize else ""))
+    return df, meta
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def cached_stream_profile(file_id: str, _file) -> tuple[pd.DataFrame, dict, pd.DataFrame, DatasetProfile, dict]:
+    # Modo streaming: lê em lotes; só a amostra e o perfil do arquivo inteiro ficam em memória
+    prof, meta = profile_csv_stream(_file)
+    return prof.sample, prof.quality_metrics(), prof.summary(), prof.to_profile(), meta
 
 
 @st.cache_data(show_spinner=False)
-def cached_summary(df: pd.DataFrame):
-    return basic_summary(df)
+def cached_cleaning_plan(fp: str, _df: pd.DataFrame) -> dict:
+    return cleaning_plan_from_df(_df)
 
 
 @st.cache_data(show_spinner=False)
-def cached_insights(df: pd.DataFrame):
-    return generate_auto_insights(df, use_llm=False)
+def cached_profile(fp: str, _df: pd.DataFrame, persist: bool = False) -> DatasetProfile:
+    # Um perfil por dataset (chave = fingerprint, O(1) por rerun): resumo, qualidade,
+    # insights e relatórios saem dele. Com persist, o perfil também fica em disco.
+    store = get_dataset_store()
+    if persist:
+        profile = store.get_profile(fp)
+        if profile is not None:
+            return profile
+    profile = profile_dataset(_df)
+    if persist:
+        store.put_profile(fp, profile)
+    return profile
 
 
 # ----------------------------
@@ -47,6 +74,16 @@ st.title("🧠 InsightMind — AutoDashboard + Limpeza + Relatório")
 with st.sidebar:
     st.header("⚙️ Configurações")
     max_rows_preview = st.slider("Linhas no preview", 10, 200, 50)
+    optimize_memory = st.checkbox(
+        "Compactar memória (dtypes)",
+        value=False,
+        help="Numéricas no menor tipo seguro e textos repetitivos como category. O CSV exportado mantém os tipos originais.",
+    )
+    streaming_mode = st.checkbox(
+        "Modo streaming (arquivos grandes)",
+        value=False,
+        help="Lê o CSV em lotes. Métricas usam o arquivo inteiro; preview, gráficos e limpeza usam uma amostra.",
+    )
     st.markdown("---")
     file = st.file_uploader("📁 Envie um CSV", type=["csv"])
 
@@ -57,10 +94,23 @@ if not file:
 
 
 # ✅ leitura cacheada
-df, meta = cached_load_csv(file)
+stream_qm, stream_summary, stream_profile = None, None, None
+file_id = getattr(file, "file_id", None) or f"{file.name}-{file.size}"
+if streaming_mode:
+    df, stream_qm, stream_summary, stream_profile, meta = cached_stream_profile(file_id, file)
+else:
+    df, meta = cached_load_csv(file_id, file, optimize_memory)
 st.session_state["df_raw"] = df  # sem copy() para não gastar memória
 
 
+def profile_of(d: pd.DataFrame) -> DatasetProfile:
+    # Streaming: a amostra carregada responde com o perfil do arquivo inteiro (insights, relatórios, chat)
+    if stream_profile is not None and d is df:
+        return stream_profile
+    # Só o perfil do df carregado vai para o disco (acompanha a entrada do DatasetStore)
+    return cached_profile(fingerprint(d), d, persist=(d is df and "content_key" in meta))
+
+
 # Estado inicial
 if "chat_history" not in st.session_state:
     st.session_state["chat_history"] = []
@@ -71,42 +121,70 @@ if "df_clean" not in st.session_state:
 
 # Preview
 st.subheader("🧾 Preview do dataset")
+n_rows_total = stream_qm["linhas"] if stream_qm else df.shape[0]
 st.caption(
-    f"Linhas: {df.shape[0]} | Colunas: {df.shape[1]} | Encoding: {meta.get('encoding')} | Sep: {meta.get('sep')}"
+    f"Linhas: {n_rows_total} | Colunas: {df.shape[1]} | Encoding: {meta.get('encoding')} | Sep: {meta.get('sep')}"
+    f" | Detecção: {meta.get('sniff_method')} (confiança {meta.get('sniff_confidence')})"
+    f" | Cache: {meta.get('cache')}"
 )
+if "mem_bytes_before" in meta:
+    st.caption(
+        f"Memória: {meta['mem_bytes_before'] / 1e6:.1f} MB → {meta['mem_bytes_after'] / 1e6:.1f} MB "
+        f"({len(meta.get('dtype_changes', {}))} colunas compactadas)"
+    )
+if streaming_mode:
+    st.info(
+        f"Modo streaming: métricas calculadas sobre as {n_rows_total} linhas; "
+        f"insights e relatórios usam o perfil do arquivo inteiro; "
+        f"preview, gráficos e limpeza usam uma amostra de {df.shape[0]} linhas."
+    )
+    if meta.get("sniff_low_confidence"):
+        st.warning(
+            f"Separador/aspas detectados com baixa confiança ({meta.get('sniff_confidence')}): o dialeto foi "
+            f"refeito só no início do arquivo (sep '{meta.get('sep')}'). Confira o preview ou desative o modo streaming."
+        )
 
 df_preview = df.head(max_rows_preview)
 st.dataframe(df_preview, use_container_width=True)
 
 
-tabs = st.tabs(["📌 Resumo", "📈 Gráficos", "✅ Diagnóstico", "🧼 Limpeza", "🧾 Relatório"])
+# Seções preguiçosas: st.tabs executa o corpo de todas as abas a cada rerun;
+# aqui só a seção aberta roda (os resultados pesados ficam cacheados por fingerprint).
+SECTIONS = ["📌 Resumo", "📈 Gráficos", "✅ Diagnóstico", "🧼 Limpeza", "🧾 Relatório"]
+section = st.radio("Seção", SECTIONS, horizontal=True, key="section", label_visibility="collapsed")
 
 
 # --- Resumo
-with tabs[0]:
+if section == SECTIONS[0]:
     colA, colB = st.columns([1, 1])
 
     with colA:
         st.markdown("### Resumo Estatístico")
         # ✅ cacheado
-        summary_df = cached_summary(df)
+        summary_df = stream_summary if streaming_mode else profile_of(df).summary()
         st.dataframe(summary_df.head(200), use_container_width=True)
 
     with colB:
         st.markdown("### Métricas de Qualidade")
         # ✅ cacheado
-        qm = cached_quality(df)
+        qm = stream_qm if streaming_mode else profile_of(df).quality_metrics()
         st.json(qm)
+        if qm.get("linhas_duplicadas_exato") is False:
+            st.caption("⚠️ linhas_duplicadas é uma estimativa (HyperLogLog): o arquivo passou do limite de contagem exata.")
 
 
 # --- Gráficos
-with tabs[1]:
+if section == SECTIONS[1]:
     st.markdown("### Visualizações Avançadas")
     st.caption("Para evitar lentidão, os gráficos só são gerados quando você clicar no botão.")
 
     df_plot = st.session_state.get("df_clean", df)
 
+    # Flag na sessão: os seletores dos gráficos (eixos, cor, matriz de pares) geram reruns
+    # em que o botão volta a False; a seção continua visível enquanto o dataset for o mesmo
     if st.button("📈 Gerar gráficos"):
+        st.session_state["charts_for"] = fingerprint(df_plot)
+    if st.session_state.get("charts_for") == fingerprint(df_plot):
         try:
             render_visuals(df_plot)
         except Exception as e:
@@ -117,21 +195,26 @@ with tabs[1]:
 
 
 # --- Diagnóstico
-with tabs[2]:
+if section == SECTIONS[2]:
     st.markdown("### ✅ Diagnóstico Automático do Dataset")
     st.caption("Análise automática: qualidade, riscos, insights e recomendações.")
 
     df_diag = st.session_state.get("df_clean", df)
 
     # ✅ cacheado
-    qm_diag = cached_quality(df_diag)
-    summary_diag = cached_summary(df_diag)
-    insights_diag = cached_insights(df_diag)
+    if streaming_mode and "df_clean" not in st.session_state:
+        qm_diag, summary_diag = stream_qm, stream_summary
+    else:
+        qm_diag = profile_of(df_diag).quality_metrics()
+        summary_diag = profile_of(df_diag).summary()
+    insights_diag = insights_from_profile(profile_of(df_diag))
 
     col1, col2 = st.columns([1, 1])
     with col1:
         st.markdown("#### 📊 Métricas de Qualidade")
         st.json(qm_diag)
+        if qm_diag.get("linhas_duplicadas_exato") is False:
+            st.caption("⚠️ linhas_duplicadas é uma estimativa (HyperLogLog): o arquivo passou do limite de contagem exata.")
 
     with col2:
         st.markdown("#### 🧾 Resumo Estatístico (top 30)")
@@ -185,11 +268,11 @@ with tabs[2]:
 
 
 # --- Limpeza
-with tabs[3]:
+if section == SECTIONS[3]:
     st.markdown("### 🧼 Modo Limpar Dataset")
     st.caption("Pipeline automático + opções. Você pode baixar o CSV tratado no final.")
 
-    plan_default = cleaning_plan_from_df(df)
+    plan_default = cached_cleaning_plan(fingerprint(df), df)
 
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -210,21 +293,33 @@ with tabs[3]:
         drop_constant_cols = st.checkbox("Remover colunas constantes", value=plan_default["drop_constant_cols"])
         outlier_clip = st.checkbox("Clip de outliers (IQR)", value=plan_default["outlier_clip"])
 
+    saved_plan = st.file_uploader("Ou aplique um plano salvo (JSON)", type=["json"], key="plan_upload")
+
     if st.button("Aplicar limpeza"):
-        cleaned, log = clean_dataset(
-            df=df,
-            remove_duplicates=remove_duplicates,
-            trim_strings=trim_strings,
-            parse_dates=parse_dates,
-            drop_high_missing=drop_high_missing,
-            missing_threshold=missing_threshold / 100.0,
-            impute_numeric=impute_numeric,
-            impute_categorical=impute_categorical,
-            drop_constant_cols=drop_constant_cols,
-            outlier_clip=outlier_clip,
-        )
+        if saved_plan is not None:
+            # Plano salvo: reaplica o estado ajustado (datas, colunas, imputação, limites) sem reajustar
+            plan = CleaningPlan.from_json(saved_plan.getvalue().decode("utf-8"))
+            cleaned, log = plan.transform(df)
+        else:
+            plan = CleaningPlan(
+                remove_duplicates=remove_duplicates,
+                trim_strings=trim_strings,
+                parse_dates=parse_dates,
+                drop_high_missing=drop_high_missing,
+                missing_threshold=missing_threshold / 100.0,
+                impute_numeric=impute_numeric,
+                impute_categorical=impute_categorical,
+                drop_constant_cols=drop_constant_cols,
+                outlier_clip=outlier_clip,
+            )
+            cleaned, log = plan.fit_transform(df)
         st.session_state["df_clean"] = cleaned
         st.session_state["clean_log"] = log
+        st.session_state["clean_plan"] = plan
+        stale = st.session_state.pop("clean_export", None)  # arquivo gerado para a limpeza anterior
+        if stale:
+            Path(stale["path"]).unlink(missing_ok=True)
+        fingerprint(cleaned)  # identidade calculada uma vez, no momento da limpeza
         st.success("Limpeza aplicada!")
 
         # ✅ opcional: limpar caches dependentes (quando df_clean muda, caches do df original não atrapalham;
@@ -239,16 +334,39 @@ with tabs[3]:
         st.markdown("#### ✅ Preview do dataset tratado")
         st.dataframe(st.session_state["df_clean"].head(max_rows_preview), use_container_width=True)
 
-        st.download_button(
-            "⬇️ Baixar CSV tratado",
-            data=st.session_state["df_clean"].to_csv(index=False).encode("utf-8"),
-            file_name="dataset_tratado.csv",
-            mime="text/csv",
-        )
+        # Exportação só no clique: o arquivo é gravado em lotes num temporário (sem o CSV inteiro em memória)
+        export_fmt = st.selectbox("Formato de exportação", list(EXPORT_FORMATS), index=0)
+        export_key = (fingerprint(st.session_state["df_clean"]), export_fmt)
+        if st.button("Gerar arquivo tratado", help="Grava o arquivo (reaproveitado se já existir) e libera o download."):
+            export = st.session_state.get("clean_export")
+            if not (export and export["key"] == export_key and Path(export["path"]).exists()):
+                if export:
+                    Path(export["path"]).unlink(missing_ok=True)
+                with st.spinner("Gravando arquivo..."):
+                    path = export_frame(st.session_state["df_clean"], export_fmt, meta.get("dtype_changes"))
+                export = st.session_state["clean_export"] = {"key": export_key, "path": path}
+            # o download_button lê o arquivo para a memória: só neste rerun, não em todo rerun da seção
+            ext, mime, _ = EXPORT_FORMATS[export_fmt]
+            with open(export["path"], "rb") as fh:
+                st.download_button(
+                    f"⬇️ Baixar dataset tratado ({export_fmt})",
+                    data=fh,
+                    file_name=f"dataset_tratado{ext}",
+                    mime=mime,
+                )
+
+        if "clean_plan" in st.session_state:
+            st.download_button(
+                "⬇️ Baixar plano de limpeza (JSON)",
+                data=st.session_state["clean_plan"].to_json().encode("utf-8"),
+                file_name="plano_limpeza.json",
+                mime="application/json",
+                help="Reaplique em outros arquivos pelo app ou em lote: python -m core.batch plano_limpeza.json entrada/ saida/",
+            )
 
 
 # --- Relatório
-with tabs[4]:
+if section == SECTIONS[4]:
     st.markdown("### 🧾 Relatório HTML/PDF (gráficos + insights)")
     st.caption("Gera um HTML interativo e um PDF (com imagens dos principais gráficos).")
 
@@ -270,19 +388,24 @@ with tabs[4]:
         disabled=not profiling_available,
     )
 
+    png_scale = st.select_slider(
+        "Resolução das imagens do PDF (escala)",
+        options=[1.0, 1.5, 2.0, 3.0],
+        value=2.0,
+        help="Escala maior = imagens mais nítidas e PDF mais pesado. PNGs já gerados ficam em cache.",
+    )
+
     colA, colB = st.columns(2)
     with colA:
         if st.button("Gerar HTML"):
             with st.spinner("Montando HTML..."):
-                # ✅ cacheado (rápido)
-                qm_for_report = cached_quality(df_for_report)
-                insights_for_report = cached_insights(df_for_report)
+                # ✅ perfil cacheado (rápido)
+                profile_for_report = profile_of(df_for_report)
 
                 try:
                     html_bytes = build_html_report(
+                        profile_for_report,
                         df_for_report,
-                        qm_for_report,
-                        insights_for_report,
                         include_profiling=include_profiling,
                     )
                 except Exception as e:
@@ -301,12 +424,11 @@ with tabs[4]:
     with colB:
         if st.button("Gerar PDF"):
             with st.spinner("Montando PDF..."):
-                # ✅ cacheado + gera figs só no clique
-                qm_for_report = cached_quality(df_for_report)
-                insights_for_report = cached_insights(df_for_report)
+                # ✅ perfil cacheado + gera figs só no clique
+                profile_for_report = profile_of(df_for_report)
 
-                figs = build_report_figures(df_for_report)
-                pdf_bytes = build_pdf_report(df_for_report, qm_for_report, insights_for_report, figs)
+                figs = build_report_figures(df_for_report, scale=png_scale)
+                pdf_bytes = build_pdf_report(profile_for_report, figs)
 
             st.download_button(
                 "⬇️ Baixar relatório PDF",
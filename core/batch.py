@@ -0,0 +1,82 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from core.cleaning import CleaningPlan
+from core.export import EXPORT_FORMATS, export_frame
+from core.loader import load_csv_bytes
+
+# Ajustes do processamento em lote
+_BATCH_PATTERN = "*.csv"   # arquivos considerados no diretório de entrada
+_BATCH_SUFFIX = "_tratado"  # sufixo do arquivo limpo (dados.csv -> dados_tratado.csv)
+
+
+def _clean_file(plan_dict: dict, src: str, out_dir: str, fmt: str = "csv") -> dict:
+    """Executado no processo filho: lê, aplica o plano (sem reajuste) e grava o arquivo limpo."""
+    result = {"file": src, "output": None, "rows_in": None, "rows_out": None, "log": [], "error": None}
+    try:
+        df, _ = load_csv_bytes(Path(src).read_bytes())
+        cleaned, log = CleaningPlan.from_dict(plan_dict).transform(df)
+        dst = Path(out_dir) / f"{Path(src).stem}{_BATCH_SUFFIX}{EXPORT_FORMATS[fmt][0]}"
+        export_frame(cleaned, fmt, path=str(dst))
+        result.update(output=str(dst), rows_in=int(df.shape[0]), rows_out=int(cleaned.shape[0]), log=log)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def run_plan_on_directory(
+    plan: CleaningPlan,
+    src_dir,
+    out_dir,
+    workers: int | None = None,
+    pattern: str = _BATCH_PATTERN,
+    fmt: str = "csv",
+) -> list[dict]:
+    """
+    Aplica um plano ajustado a todos os CSVs de src_dir, um arquivo por processo.
+    Falhas ficam no resultado do arquivo (campo error) sem interromper o lote.
+    """
+    if not plan.fitted:
+        raise ValueError("Plano de limpeza não ajustado: use fit() ou fit_transform() antes.")
+    files = sorted(str(p) for p in Path(src_dir).glob(pattern) if p.is_file())
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    if not files:
+        return []
+
+    plan_dict = plan.to_dict()
+    workers = max(1, min(workers or os.cpu_count() or 1, len(files)))
+    if workers == 1:
+        return [_clean_file(plan_dict, f, str(out_dir), fmt) for f in files]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_clean_file, plan_dict, f, str(out_dir), fmt) for f in files]
+        return [fut.result() for fut in futures]  # resultados na ordem dos arquivos
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Aplica um plano de limpeza salvo (JSON) a um diretório de CSVs.")
+    parser.add_argument("plan", help="arquivo JSON do plano (CleaningPlan.save / download no app)")
+    parser.add_argument("src_dir", help="diretório com os CSVs de entrada")
+    parser.add_argument("out_dir", help="diretório de saída dos CSVs tratados")
+    parser.add_argument("--workers", type=int, default=None, help="processos em paralelo (padrão: nº de CPUs)")
+    parser.add_argument("--format", dest="fmt", choices=list(EXPORT_FORMATS), default="csv", help="formato de saída")
+    parser.add_argument("--pattern", default=_BATCH_PATTERN, help="glob dos arquivos (padrão: *.csv)")
+    args = parser.parse_args(argv)
+
+    results = run_plan_on_directory(
+        CleaningPlan.load(args.plan), args.src_dir, args.out_dir, workers=args.workers, pattern=args.pattern, fmt=args.fmt
+    )
+    failed = 0
+    for r in results:
+        if r["error"]:
+            failed += 1
+            print(f"ERRO  {r['file']}: {r['error']}")
+        else:
+            print(f"OK    {r['file']} -> {r['output']} ({r['rows_in']} -> {r['rows_out']} linhas)")
+    print(f"{len(results) - failed}/{len(results)} arquivos tratados.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
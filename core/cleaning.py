@@ -1,7 +1,25 @@
+# Serialização do plano de limpeza e execução em paralelo por blocos de colunas
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
 # Importa a biblioteca pandas para manipulação de dados em DataFrames
 import pandas as pd
 # Importa a biblioteca numpy para operações numéricas
 import numpy as np
+# Índice de hashes de linha compartilhado (duplicadas em O(n))
+from core.rowhash import row_hash_index
+
+# Tipo que astype(str) produz nesta versão do pandas (object no 2.x, str no 3.x)
+_TEXT_DTYPE = pd.Series([], dtype=object).astype(str).dtype
+
+# Execução em blocos de colunas (INSIGHTMIND_CLEAN_WORKERS: processos padrão; 0 = nº de CPUs)
+_CLEAN_WORKERS = int(os.environ.get("INSIGHTMIND_CLEAN_WORKERS", "1"))
+_PARALLEL_MIN_CELLS = 2_000_000  # abaixo disso (linhas x colunas) a limpeza roda em série
+_BLOCKS_PER_WORKER = 2           # blocos por processo (equilibra colunas lentas)
+_TEXT_COLUMN_WEIGHT = 8          # custo relativo de uma coluna de texto vs numérica na divisão
 
 # Função que gera um plano de limpeza a partir de um DataFrame
 def cleaning_plan_from_df(df: pd.DataFrame) -> dict:
@@ -18,85 +36,475 @@ def cleaning_plan_from_df(df: pd.DataFrame) -> dict:
         "outlier_clip": False,      # Não aplicar clipping de outliers por padrão
     }
 
-# Função que tenta converter colunas de texto em datas
-def _try_parse_dates(df: pd.DataFrame) -> pd.DataFrame:
-    out = df.copy()  # Cria uma cópia do DataFrame
-    obj_cols = out.select_dtypes(include=["object"]).columns  # Seleciona colunas de tipo objeto (strings)
+# As etapas abaixo recebem o quadro de trabalho de clean_dataset e o alteram
+# substituindo colunas inteiras (out[c] = ...), nunca escrevendo nos arrays
+# existentes: o DataFrame de entrada continua intacto sem precisar de cópias.
+
+# Formatos candidatos (ordem = prioridade em empate; dd/mm antes de mm/dd)
+_DATE_FORMATS = [
+    "ISO8601",              # 2024-01-31, 2024-01-31 10:00:00, 2024-01-31T10:00:00Z
+    "%d/%m/%Y",             # padrão brasileiro
+    "%d/%m/%Y %H:%M",
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%y",
+    "%d-%m-%Y",
+    "%d.%m.%Y",
+    "%Y/%m/%d",
+    "%m/%d/%Y",
+    "%m/%d/%Y %H:%M:%S",
+]
+_DATE_SAMPLE_ROWS = 500      # valores testados por coluna antes de decidir
+_DATE_MIN_RATE = 0.7         # fração mínima de valores válidos (amostra e coluna inteira)
+
+# Função que tira uma amostra pequena e espalhada (topo + posições ao longo da coluna) sem varrer a coluna
+def _date_sample(s: pd.Series) -> pd.Series:
+    n = len(s)
+    if n <= _DATE_SAMPLE_ROWS:
+        return s.dropna()
+    half = _DATE_SAMPLE_ROWS // 2
+    pos = np.unique(np.concatenate([np.arange(half), np.linspace(half, n - 1, half).astype(int)]))
+    return s.iloc[pos].dropna()
+
+# Função que escolhe o formato de data da coluna olhando só a amostra (None = não é data)
+def _detect_date_format(s: pd.Series) -> str | None:
+    sample = _date_sample(s)
+    if len(sample) == 0:
+        return None
+    sample = sample.astype(str)
+    if sample.str.contains(r"\d[-/.]\d", regex=True).mean() < _DATE_MIN_RATE:
+        return None  # sem separador de data entre dígitos (ex.: códigos "2001"): não é data
+    best, best_rate = None, 0.0
+    for fmt in _DATE_FORMATS:
+        rate = pd.to_datetime(sample, format=fmt, errors="coerce").notna().mean()
+        if rate > best_rate:
+            best, best_rate = fmt, rate
+            if rate == 1.0:
+                break
+    return best if best_rate >= _DATE_MIN_RATE else None
+
+# Função que tenta converter colunas de texto em datas; devolve {coluna: formato} das convertidas
+def _try_parse_dates(out: pd.DataFrame) -> dict:
+    converted = {}
+    obj_cols = out.select_dtypes(include=["object", "category"]).columns  # Seleciona colunas de texto (inclui category)
     for c in obj_cols:  # Itera sobre cada coluna de texto
         s = out[c]
-        parsed = pd.to_datetime(s, errors="coerce", infer_datetime_format=True)  # Tenta converter em datas
+        fmt = _detect_date_format(s)  # Colunas que não são data são rejeitadas só pela amostra
+        if fmt is None:
+            continue
+        parsed = pd.to_datetime(s, format=fmt, errors="coerce")  # Parse completo com formato explícito
         # Se pelo menos 70% dos valores forem válidos e houver diversidade suficiente
-        if parsed.notna().mean() >= 0.7 and parsed.nunique(dropna=True) > 5:
+        if parsed.notna().mean() >= _DATE_MIN_RATE and parsed.nunique(dropna=True) > 5:
             out[c] = parsed  # Substitui a coluna original pela versão convertida
-    return out
+            converted[c] = fmt
+    return converted
+
+# Função que padroniza um array de valores únicos (strip, "nan"/"None" -> NaN, lower)
+def _normalize_uniques(uniques) -> pd.Series:
+    norm = pd.Series(np.asarray(uniques, dtype=object)).astype(str).str.strip()  # Remove espaços extras
+    norm = norm.where(~norm.isin(["nan", "None"]))  # Converte "nan" e "None" em valores nulos
+    return norm.str.lower()  # Converte para minúsculas
+
+# Função que padroniza uma coluna de texto trabalhando só nos valores distintos (estilo category)
+def _normalize_text(s: pd.Series) -> pd.Series:
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        codes, uniques = s.cat.codes.to_numpy(), s.cat.categories
+    else:
+        codes, uniques = pd.factorize(s, use_na_sentinel=True)  # NaN real vira código -1
+    norm = _normalize_uniques(uniques)
+    # Valores distintos podem colidir após normalizar (" A" e "a"): refatoriza os únicos
+    new_codes, new_uniques = pd.factorize(norm, use_na_sentinel=True)
+    new_codes = np.append(new_codes, -1)[codes]  # código -1 (NaN) aponta p/ a sentinela no fim
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return pd.Series(pd.Categorical.from_codes(new_codes, new_uniques), index=s.index, name=s.name)
+    values = np.append(np.asarray(new_uniques, dtype=object), np.nan)[new_codes]
+    out = pd.Series(values, index=s.index, name=s.name, dtype=object)
+    return out if _TEXT_DTYPE == object else out.astype(_TEXT_DTYPE)
 
-# Função que padroniza strings
-def _trim_strings(df: pd.DataFrame) -> pd.DataFrame:
-    out = df.copy()
-    obj_cols = out.select_dtypes(include=["object"]).columns  # Seleciona colunas de texto
+# Função que padroniza strings (custo proporcional à cardinalidade, não ao número de linhas)
+def _trim_strings(out: pd.DataFrame) -> None:
+    obj_cols = out.select_dtypes(include=["object", "category"]).columns  # Seleciona colunas de texto (inclui category)
     for c in obj_cols:
-        out[c] = out[c].astype(str).str.strip()  # Remove espaços extras
-        out[c] = out[c].replace({"nan": np.nan, "None": np.nan})  # Converte "nan" e "None" em valores nulos
-        out[c] = out[c].str.lower()  # Converte para minúsculas
-    return out
-
-# Função que remove colunas constantes
-def _drop_constant_cols(df: pd.DataFrame):
-    out = df.copy()
-    dropped = []  # Lista de colunas removidas
-    for c in list(out.columns):
-        if out[c].nunique(dropna=True) <= 1:  # Se a coluna tiver apenas um valor único
-            dropped.append(c)
-            out = out.drop(columns=[c])  # Remove a coluna
-    return out, dropped
-
-# Função que realiza imputação de valores ausentes
-def _impute(df: pd.DataFrame, impute_numeric: str, impute_categorical: str):
-    out = df.copy()
-    log = []  # Registro das operações realizadas
+        try:
+            out[c] = _normalize_text(out[c])
+        except TypeError:
+            # Valores não-hasheáveis (listas, dicts...): caminho linha a linha
+            s = out[c].astype(str).str.strip()
+            s = s.replace({"nan": np.nan, "None": np.nan})
+            out[c] = s.str.lower()
+
+# Função que conta valores únicos de todas as colunas (fallback p/ valores não-hasheáveis)
+def _nunique(df: pd.DataFrame) -> pd.Series:
+    try:
+        return df.nunique(dropna=True)
+    except TypeError:
+        return df.astype(str).where(df.notna()).nunique(dropna=True)
+
+# Função que decide, numa única máscara de colunas, o que sai por missing alto e o que sai por ser constante
+def _columns_to_drop(out: pd.DataFrame, drop_high_missing: bool, missing_threshold: float, drop_constant_cols: bool):
+    n = out.shape[0]
+    cols = out.columns
+    # Proporção de missing por coluna sem materializar o isna() do frame inteiro
+    miss = 1.0 - out.count().to_numpy() / n if n else np.zeros(len(cols))
+    high_missing = (miss >= missing_threshold) if drop_high_missing else np.zeros(len(cols), dtype=bool)
+
+    constant = np.zeros(len(cols), dtype=bool)
+    if drop_constant_cols:
+        rest = ~high_missing  # colunas já removidas por missing não são reavaliadas
+        is_num = np.array([pd.api.types.is_numeric_dtype(dt) for dt in out.dtypes], dtype=bool)
+        # Numéricas: constante <=> min == max (ou tudo NaN), reduzido por bloco, sem hash por coluna
+        num = rest & is_num
+        if num.any():
+            sub = out.iloc[:, num]
+            mn, mx = sub.min().to_numpy(), sub.max().to_numpy()
+            constant[num] = (mn == mx) | pd.isna(mn)
+        # Demais colunas: nunique
+        other = rest & ~is_num
+        if other.any():
+            constant[other] = _nunique(out.iloc[:, other]).to_numpy() <= 1  # Apenas um valor único (ou nenhum)
+    return high_missing, constant
+
+# Função que calcula os valores de imputação de todas as colunas (uma redução por tipo) -> {coluna: valor}
+def _fit_impute(out: pd.DataFrame, impute_numeric: str, impute_categorical: str) -> dict:
+    fill = {}  # cobre todas as colunas para que o plano sirva a outros arquivos
 
     num_cols = out.select_dtypes(include=[np.number]).columns  # Colunas numéricas
     cat_cols = [c for c in out.columns if c not in num_cols]   # Colunas categóricas
 
-    # Imputação numérica (média ou mediana)
-    if impute_numeric in ("median", "mean"):
-        for c in num_cols:
-            if out[c].isna().any():
-                val = out[c].median() if impute_numeric == "median" else out[c].mean()
-                out[c] = out[c].fillna(val)
-        log.append(f"Imputação numérica aplicada: {impute_numeric}.")
+    # Imputação numérica (média ou mediana), uma redução para todas as colunas
+    if impute_numeric in ("median", "mean") and len(num_cols):
+        vals = out[num_cols].median() if impute_numeric == "median" else out[num_cols].mean()
+        fill.update(vals.dropna().to_dict())
 
-    # Imputação categórica (moda)
-    if impute_categorical == "mode":
+    # Imputação categórica (moda), uma contagem por coluna
+    if impute_categorical == "mode" and cat_cols:
+        has_na = out[cat_cols].count() < out.shape[0]
         for c in cat_cols:
-            if out[c].isna().any():
-                mode = out[c].mode(dropna=True)
-                if len(mode) > 0:
-                    out[c] = out[c].fillna(mode.iloc[0])
-        log.append("Imputação categórica aplicada: mode.")
-
-    return out, log
-
-# Função que aplica clipping de outliers usando IQR
-def _clip_outliers_iqr(df: pd.DataFrame):
-    out = df.copy()
-    log = []
+            mode = _column_mode(out[c], bool(has_na[c]))
+            if mode is not None:
+                fill[c] = mode
+
+    return fill
+
+# Função que calcula a moda de uma coluna com value_counts (sem o frame n x colunas do DataFrame.mode)
+def _column_mode(s: pd.Series, has_na: bool):
+    try:
+        vc = s.value_counts(dropna=True, sort=False)
+    except TypeError:
+        return None  # Valores não-hasheáveis: sem moda
+    counts = vc.to_numpy()
+    if counts.size == 0:
+        return None
+    top = counts.max()
+    if top == 0 or (top == 1 and not has_na):
+        return None  # Nenhum valor repetido e nada a preencher (ex.: coluna de IDs)
+    ties = vc.index[counts == top]
+    if len(ties) > 1:
+        try:
+            return ties.min()  # Mesma escolha do mode().iloc[0]: a menor moda
+        except TypeError:
+            pass
+    return ties[0]
+
+# Função que preenche ausentes com valores já calculados (um único fillna); devolve as colunas preenchidas
+def _fill_missing(out: pd.DataFrame, fill: dict) -> list:
+    has_na = out.count() < out.shape[0]  # Colunas com algum ausente (sem materializar isna do frame)
+    cols = [c for c in out.columns if c in fill and has_na[c]]
+    for c in cols:
+        s = out[c]
+        # Valor de um plano salvo pode não estar entre as categorias do arquivo novo
+        if isinstance(s.dtype, pd.CategoricalDtype) and fill[c] not in s.cat.categories:
+            out[c] = s.cat.add_categories([fill[c]])
+    if cols:
+        out[cols] = out[cols].fillna(value={c: fill[c] for c in cols})  # Só as colunas imputadas são substituídas
+    return cols
+
+# Função que calcula os limites IQR de todas as colunas numéricas (quartis numa chamada) -> {coluna: (lo, hi)}
+def _fit_clip_bounds(out: pd.DataFrame) -> dict:
     num_cols = out.select_dtypes(include=[np.number]).columns  # Seleciona colunas numéricas
-    for c in num_cols:
-        s = out[c].dropna()
-        if len(s) < 20:  # Ignora colunas com poucos valores
-            continue
-        q1, q3 = s.quantile(0.25), s.quantile(0.75)  # Quartis
-        iqr = q3 - q1
-        if iqr == 0:
+    if len(num_cols) == 0:
+        return {}
+    num = out[num_cols]
+    q = num.quantile([0.25, 0.75])  # Quartis de todas as colunas numa chamada
+    q1, q3 = q.iloc[0], q.iloc[1]
+    iqr = q3 - q1
+    # Ignora colunas com poucos valores (< 20) ou IQR zero
+    valid = (num.count() >= 20) & (iqr != 0) & iqr.notna()
+    cols = num_cols[valid.to_numpy()]
+    lo, hi = (q1 - 1.5 * iqr)[cols], (q3 + 1.5 * iqr)[cols]  # Limites inferior e superior
+    return {c: (float(lo[c]), float(hi[c])) for c in cols}
+
+# Função que aplica clipping com limites já calculados (clip em lote por dtype) -> {coluna: valores ajustados}
+def _apply_clip(out: pd.DataFrame, bounds: dict) -> dict:
+    cols = pd.Index([c for c in out.select_dtypes(include=[np.number]).columns if c in bounds])
+    if len(cols) == 0:
+        return {}
+    lo = pd.Series([bounds[c][0] for c in cols], index=cols, dtype=float)
+    hi = pd.Series([bounds[c][1] for c in cols], index=cols, dtype=float)
+    dtypes = out[cols].dtypes
+    changed = {}
+    # Um bloco 2D por dtype: máscaras e clip com limites por coluna via broadcasting
+    for _, group in dtypes.groupby(dtypes.astype(str)):
+        g = group.index
+        arr = out[g].to_numpy()
+        lo_g, hi_g = lo[g].to_numpy(), hi[g].to_numpy()
+        counts = ((arr < lo_g) | (arr > hi_g)).sum(axis=0)  # Conta pelas máscaras
+        hit = counts > 0
+        if hit.any():
+            clipped = np.clip(arr[:, hit], lo_g[hit], hi_g[hit])  # Ajusta valores fora do intervalo
+            g_hit = g[hit]
+            out[g_hit] = pd.DataFrame(clipped, index=out.index, columns=g_hit)
+            changed.update(zip(g_hit, counts[hit]))
+    return {c: int(changed[c]) for c in cols if c in changed}  # na ordem original das colunas
+
+# Função que converte colunas de texto com formatos de data já conhecidos (sem nova detecção)
+def _apply_date_formats(out: pd.DataFrame, formats: dict) -> dict:
+    converted = {}
+    for c, fmt in formats.items():
+        if c not in out.columns:
             continue
-        lo, hi = q1 - 1.5 * iqr, q3 + 1.5 * iqr  # Limites inferior e superior
-        before = out[c].copy()
-        out[c] = out[c].clip(lo, hi)  # Ajusta valores fora do intervalo
-        changed = (before != out[c]).sum()
-        if changed > 0:
-            log.append(f"Outliers clipados em {c}: {changed} valores ajustados.")
-    return out, log
+        s = out[c]
+        if pd.api.types.is_numeric_dtype(s.dtype) or pd.api.types.is_datetime64_any_dtype(s.dtype):
+            continue  # Coluna já tipada no arquivo novo
+        out[c] = pd.to_datetime(s, format=fmt, errors="coerce")
+        converted[c] = fmt
+    return converted
+
+# Etapas por coluna do ajuste (tudo menos duplicadas): roda no frame inteiro ou num bloco de colunas
+def _fit_columns(out: pd.DataFrame, plan: "CleaningPlan"):
+    state = {"date_formats": {}, "high_missing": [], "constant": [], "impute_values": {}, "clip_bounds": {}, "clipped": {}}
+    if plan.trim_strings:
+        _trim_strings(out)
+    if plan.parse_dates:
+        state["date_formats"] = _try_parse_dates(out)
+    if plan.drop_high_missing or plan.drop_constant_cols:
+        high_missing, constant = _columns_to_drop(out, plan.drop_high_missing, plan.missing_threshold, plan.drop_constant_cols)
+        state["high_missing"] = out.columns[high_missing].tolist()
+        state["constant"] = out.columns[constant].tolist()
+        if high_missing.any() or constant.any():
+            out = out.loc[:, ~(high_missing | constant)].copy(deep=False)  # frame novo, não fatia: escritas seguintes sem SettingWithCopyWarning
+    state["impute_values"] = _fit_impute(out, plan.impute_numeric, plan.impute_categorical)
+    _fill_missing(out, state["impute_values"])
+    if plan.outlier_clip:
+        state["clip_bounds"] = _fit_clip_bounds(out)
+        state["clipped"] = _apply_clip(out, state["clip_bounds"])
+    return out, state
+
+# Etapas por coluna da reaplicação de um plano ajustado (mesmo contrato de _fit_columns)
+def _replay_columns(out: pd.DataFrame, plan: "CleaningPlan"):
+    state = {"date_formats": {}, "dropped": [], "filled": [], "clipped": {}}
+    if plan.trim_strings:
+        _trim_strings(out)
+    if plan.parse_dates:
+        state["date_formats"] = _apply_date_formats(out, plan.date_formats)
+    mask = out.columns.isin(plan.drop_columns)
+    if mask.any():
+        state["dropped"] = out.columns[mask].tolist()
+        out = out.loc[:, ~mask].copy(deep=False)
+    state["filled"] = _fill_missing(out, plan.impute_values)
+    if plan.outlier_clip:
+        state["clipped"] = _apply_clip(out, plan.clip_bounds)
+    return out, state
+
+# Função que divide as colunas em faixas contíguas de custo parecido (texto pesa mais que número)
+def _column_blocks(out: pd.DataFrame, n_blocks: int) -> list[slice]:
+    weights = np.array([1 if pd.api.types.is_numeric_dtype(dt) else _TEXT_COLUMN_WEIGHT for dt in out.dtypes])
+    edges = np.searchsorted(np.cumsum(weights), np.linspace(0, weights.sum(), n_blocks + 1)[1:-1], side="right")
+    bounds = [0, *sorted(set(edges.tolist()) - {0, len(weights)}), len(weights)]
+    return [slice(lo, hi) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+# Função que roda as etapas por coluna em série ou em blocos num pool de processos -> (out, estados por bloco)
+def _run_columns(func, out: pd.DataFrame, plan: "CleaningPlan", workers: int | None):
+    workers = _CLEAN_WORKERS if workers is None else workers
+    workers = (os.cpu_count() or 1) if workers <= 0 else workers
+    n_rows, n_cols = out.shape
+    if workers <= 1 or n_cols < 2 or n_rows * n_cols < _PARALLEL_MIN_CELLS:
+        out, state = func(out, plan)  # frame pequeno: o custo de enviar blocos não compensa
+        return out, [state]
+    blocks = [out.iloc[:, sl] for sl in _column_blocks(out, min(n_cols, workers * _BLOCKS_PER_WORKER))]
+    # spawn: o servidor do Streamlit tem threads, fork não é seguro (mesmo contexto do core/render.py)
+    with ProcessPoolExecutor(max_workers=min(workers, len(blocks)), mp_context=multiprocessing.get_context("spawn")) as pool:
+        results = list(pool.map(func, blocks, [plan] * len(blocks)))  # map preserva a ordem dos blocos
+    out = pd.concat([r[0] for r in results], axis=1)
+    return out, [r[1] for r in results]
+
+# Função que junta os estados dos blocos na ordem das colunas (dicts unidos, listas concatenadas)
+def _merge_states(states: list[dict]) -> dict:
+    merged = {}
+    for st in states:
+        for k, v in st.items():
+            if isinstance(v, dict):
+                merged.setdefault(k, {}).update(v)
+            else:
+                merged.setdefault(k, []).extend(v)
+    return merged
+
+# Valores de imputação em JSON: Timestamp vira {"timestamp": iso}, escalares numpy viram Python
+def _encode_value(v):
+    if isinstance(v, pd.Timestamp):
+        return {"timestamp": v.isoformat()}
+    if isinstance(v, np.generic):
+        return v.item()
+    return v
+
+def _decode_value(v):
+    if isinstance(v, dict) and "timestamp" in v:
+        return pd.Timestamp(v["timestamp"])
+    return v
+
+
+@dataclass
+class CleaningPlan:
+    """
+    Parâmetros da limpeza + estado ajustado no dataset de referência (formatos de data,
+    colunas removidas, valores de imputação, limites IQR). Depois de fit_transform(),
+    transform() reaplica o mesmo tratamento a outros arquivos sem recalcular nada.
+    """
+
+    remove_duplicates: bool = True
+    trim_strings: bool = True
+    parse_dates: bool = True
+    drop_high_missing: bool = False
+    missing_threshold: float = 0.6
+    impute_numeric: str = "median"
+    impute_categorical: str = "mode"
+    drop_constant_cols: bool = True
+    outlier_clip: bool = False
+    # Estado ajustado (preenchido por fit/fit_transform)
+    fitted: bool = False
+    columns: list = field(default_factory=list)
+    date_formats: dict = field(default_factory=dict)
+    drop_columns: list = field(default_factory=list)
+    impute_values: dict = field(default_factory=dict)
+    clip_bounds: dict = field(default_factory=dict)
+
+    def _dedupe(self, df: pd.DataFrame):
+        # Quadro de trabalho: cópia rasa (não duplica os dados); cada etapa troca só as colunas que altera
+        out = df.copy(deep=False)
+        log = []
+
+        # Remover duplicadas (única etapa que olha a linha inteira; o resto é por coluna)
+        if self.remove_duplicates:
+            d0 = out.shape[0]
+            out = row_hash_index(df).drop_duplicates(out)  # máscara vem do índice do df de entrada (mesmas posições)
+            d1 = out.shape[0]
+            if d1 != d0:
+                log.append(f"Removidas duplicadas: {d0 - d1} linhas.")
+        return out, log
+
+    def fit_transform(self, df: pd.DataFrame, workers: int | None = None):
+        """
+        Ajusta o plano em df e devolve (df_limpo, log). Com workers > 1 (0 = nº de CPUs),
+        frames grandes são limpos em blocos de colunas num pool de processos; resultado
+        e log são os mesmos da execução em série.
+        """
+        out, log = self._dedupe(df)
+        self.columns = list(df.columns)
+        out, states = _run_columns(_fit_columns, out, self, workers)
+        state = _merge_states(states)
+
+        # Padronizar strings
+        if self.trim_strings:
+            log.append("Strings padronizadas (strip/lower).")
+
+        # Converter datas
+        self.date_formats = state["date_formats"]
+        if self.parse_dates:
+            log.append("Tentativa de conversão de datas aplicada.")
+            if self.date_formats:
+                log.append("Datas convertidas: " + ", ".join(f"{c} ({fmt})" for c, fmt in self.date_formats.items()))
+
+        # Colunas com muitos valores ausentes e colunas constantes
+        to_drop, dropped = state["high_missing"], state["constant"]
+        if to_drop:
+            log.append(f"Colunas removidas por missing >= {self.missing_threshold:.0%}: {', '.join(map(str, to_drop))}")
+        if dropped:
+            log.append(f"Colunas constantes removidas: {', '.join(map(str, dropped))}")
+        self.drop_columns = to_drop + dropped
+
+        # Imputação de valores ausentes
+        self.impute_values = state["impute_values"]
+        if self.impute_numeric in ("median", "mean"):
+            log.append(f"Imputação numérica aplicada: {self.impute_numeric}.")
+        if self.impute_categorical == "mode":
+            log.append("Imputação categórica aplicada: mode.")
+
+        # Clipping de outliers
+        self.clip_bounds = state["clip_bounds"]
+        for c, n in state["clipped"].items():
+            log.append(f"Outliers clipados em {c}: {n} valores ajustados.")
+
+        self.fitted = True
+        # Caso nenhuma alteração tenha sido feita
+        if not log:
+            log.append("Nenhuma alteração aplicada.")
+        return out, log
+
+    def fit(self, df: pd.DataFrame, workers: int | None = None) -> "CleaningPlan":
+        self.fit_transform(df, workers=workers)
+        return self
+
+    def transform(self, df: pd.DataFrame, workers: int | None = None):
+        """Reaplica o plano ajustado a um novo frame, sem refazer detecções/estatísticas."""
+        if not self.fitted:
+            raise ValueError("Plano de limpeza não ajustado: use fit() ou fit_transform() antes.")
+        out, log = self._dedupe(df)
+        out, states = _run_columns(_replay_columns, out, self, workers)
+        state = _merge_states(states)
+
+        if self.trim_strings:
+            log.append("Strings padronizadas (strip/lower).")
+
+        present = set(df.columns)
+        absent = [c for c in self.columns if c not in present]
+        if absent:
+            log.append(f"Colunas do plano ausentes no arquivo: {', '.join(map(str, absent))}")
+
+        # Datas com os formatos do plano
+        if state["date_formats"]:
+            log.append("Datas convertidas: " + ", ".join(f"{c} ({fmt})" for c, fmt in state["date_formats"].items()))
+
+        # Mesmas colunas removidas no ajuste
+        if state["dropped"]:
+            log.append(f"Colunas removidas pelo plano: {', '.join(map(str, state['dropped']))}")
+
+        # Imputação com os valores do ajuste
+        if state["filled"]:
+            log.append(f"Imputação pelo plano aplicada em {len(state['filled'])} colunas.")
+
+        # Clipping com os limites do ajuste
+        for c, n in state["clipped"].items():
+            log.append(f"Outliers clipados em {c}: {n} valores ajustados.")
+
+        if not log:
+            log.append("Nenhuma alteração aplicada.")
+        return out, log
+
+    def to_dict(self) -> dict:
+        d = {k: getattr(self, k) for k in self.__dataclass_fields__}
+        d["impute_values"] = {c: _encode_value(v) for c, v in self.impute_values.items()}
+        d["clip_bounds"] = {c: list(b) for c, b in self.clip_bounds.items()}
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "CleaningPlan":
+        d = dict(d)
+        d["impute_values"] = {c: _decode_value(v) for c, v in d.get("impute_values", {}).items()}
+        d["clip_bounds"] = {c: tuple(b) for c, b in d.get("clip_bounds", {}).items()}
+        return cls(**d)
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2, default=str)
+
+    @classmethod
+    def from_json(cls, text: str) -> "CleaningPlan":
+        return cls.from_dict(json.loads(text))
+
+    def save(self, path) -> None:
+        Path(path).write_text(self.to_json(), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path) -> "CleaningPlan":
+        return cls.from_json(Path(path).read_text(encoding="utf-8"))
 
 # Função principal que aplica todas as etapas de limpeza
 def clean_dataset(
@@ -110,52 +518,17 @@ def clean_dataset(
     impute_categorical: str,
     drop_constant_cols: bool,
     outlier_clip: bool,
+    workers: int | None = None,
 ):
-    out = df.copy()
-    log = []
-
-    # Remover duplicadas
-    if remove_duplicates:
-        d0 = out.shape[0]
-        out = out.drop_duplicates()
-        d1 = out.shape[0]
-        if d1 != d0:
-            log.append(f"Removidas duplicadas: {d0 - d1} linhas.")
-
-    # Padronizar strings
-    if trim_strings:
-        out = _trim_strings(out)
-        log.append("Strings padronizadas (strip/lower).")
-
-    # Converter datas
-    if parse_dates:
-        out = _try_parse_dates(out)
-        log.append("Tentativa de conversão de datas aplicada.")
-
-    # Remover colunas com muitos valores ausentes
-    if drop_high_missing:
-        miss = out.isna().mean()
-        to_drop = miss[miss >= missing_threshold].index.tolist()
-        if to_drop:
-            out = out.drop(columns=to_drop)
-            log.append(f"Colunas removidas por missing >= {missing_threshold:.0%}: {', '.join(to_drop)}")
-
-    # Remover colunas constantes
-    if drop_constant_cols:
-        out, dropped = _drop_constant_cols(out)
-        if dropped:
-            log.append(f"Colunas constantes removidas: {', '.join(dropped)}")
-
-    # Imputação de valores ausentes
-    out, impute_log = _impute(out, impute_numeric, impute_categorical)
-    log.extend(impute_log)
-
-    # Clipping de outliers
-    if outlier_clip:
-        out, out_log = _clip_outliers_iqr(out)
-        log.extend(out_log)
-
-    # Caso nenhuma alteração tenha sido feita
-    if not log:
-        log.append("Nenhuma alteração aplicada.")
-    return out, log
+    plan = CleaningPlan(
+        remove_duplicates=remove_duplicates,
+        trim_strings=trim_strings,
+        parse_dates=parse_dates,
+        drop_high_missing=drop_high_missing,
+        missing_threshold=missing_threshold,
+        impute_numeric=impute_numeric,
+        impute_categorical=impute_categorical,
+        drop_constant_cols=drop_constant_cols,
+        outlier_clip=outlier_clip,
+    )
+    return plan.fit_transform(df, workers=workers)
@@ -0,0 +1,109 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# Ajustes do motor de correlação (top-k pares sem materializar a matriz p x p)
+_BLOCK_COLS = 512        # colunas por bloco: cada produto gera no máximo 512 x 512 valores
+_SAMPLE_SEED = 0         # amostra de linhas reprodutível
+
+
+def _standardize(x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Centra e escala cada coluna in-place (float32, NaN preservado); colunas sem variância ficam inválidas."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # coluna toda NaN
+        mean = np.nanmean(x, axis=0, dtype=np.float64)
+        std = np.nanstd(x, axis=0, dtype=np.float64)
+    valid = np.isfinite(std) & (std > 0)
+    x -= mean.astype(np.float32)
+    x /= np.where(valid, std, 1.0).astype(np.float32)
+    return x, valid
+
+
+class _Block:
+    """Colunas [lo, hi) padronizadas; com NaN guarda também máscara e valores zerados."""
+
+    def __init__(self, z: np.ndarray, lo: int, hi: int):
+        self.lo, self.hi = lo, hi
+        self.z = z[:, lo:hi]
+        mask = ~np.isnan(self.z)
+        self.has_nan = not mask.all()
+        self._mask = mask
+
+    def masked(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(máscara, valores com NaN -> 0, quadrados) em float32 para os produtos pareados."""
+        if not hasattr(self, "_masked"):
+            z0 = np.where(self._mask, self.z, np.float32(0))
+            self._masked = (self._mask.astype(np.float32), z0, z0 * z0)
+        return self._masked
+
+
+def _block_corr(a: _Block, b: _Block, n_rows: int) -> np.ndarray:
+    """Pearson entre as colunas de a e b; com NaN, só nas linhas em que o par existe."""
+    if not a.has_nan and not b.has_nan:
+        return (a.z.T @ b.z) / np.float32(n_rows)
+    ma, za, za2 = a.masked()
+    mb, zb, zb2 = b.masked()
+    n = ma.T @ mb
+    sx, sy = za.T @ mb, ma.T @ zb
+    sxx, syy = za2.T @ mb, ma.T @ zb2
+    sxy = za.T @ zb
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx * sx) * (n * syy - sy * sy))
+    r[n < 2] = np.nan
+    return r
+
+
+def top_correlations(
+    df: pd.DataFrame,
+    k: int = 10,
+    sample_rows: int | None = None,
+    block_cols: int = _BLOCK_COLS,
+) -> list[tuple]:
+    """
+    Os k pares de colunas numéricas com maior |r| (Pearson, pares completos como no
+    df.corr()), calculados por blocos em float32 e mantendo só k candidatos por vez:
+    memória O(linhas x bloco), nunca O(p²). sample_rows limita as linhas usadas.
+    """
+    num = df.select_dtypes(include=[np.number])
+    p = num.shape[1]
+    if p < 2 or k <= 0:
+        return []
+    if sample_rows is not None and num.shape[0] > sample_rows:
+        rng = np.random.default_rng(_SAMPLE_SEED)
+        num = num.iloc[np.sort(rng.choice(num.shape[0], sample_rows, replace=False))]
+    n_rows = num.shape[0]
+    x = num.to_numpy(dtype=np.float32, na_value=np.nan)
+    if not x.flags.writeable:
+        x = x.copy()  # frame já em float32: to_numpy devolve uma view somente leitura
+    z, valid = _standardize(x)
+
+    best_v = np.empty(0, dtype=np.float32)
+    best_i = np.empty(0, dtype=np.int64)
+    best_j = np.empty(0, dtype=np.int64)
+    starts = list(range(0, p, block_cols))
+    for bi, lo_a in enumerate(starts):
+        a = _Block(z, lo_a, min(lo_a + block_cols, p))
+        for lo_b in starts[bi:]:
+            b = a if lo_b == lo_a else _Block(z, lo_b, min(lo_b + block_cols, p))
+            r = np.abs(_block_corr(a, b, n_rows))
+            keep = ~np.isnan(r) & valid[a.lo:a.hi, None] & valid[None, b.lo:b.hi]
+            if b is a:
+                keep &= np.triu(np.ones(r.shape, dtype=bool), k=1)  # só pares i < j
+            ii, jj = np.nonzero(keep)
+            if ii.size == 0:
+                continue
+            v = r[ii, jj]
+            if v.size > k:
+                top = np.argpartition(-v, k - 1)[:k]
+                v, ii, jj = v[top], ii[top], jj[top]
+            best_v = np.concatenate([best_v, v])
+            best_i = np.concatenate([best_i, ii + a.lo])
+            best_j = np.concatenate([best_j, jj + b.lo])
+            if best_v.size > k:
+                top = np.argpartition(-best_v, k - 1)[:k]
+                best_v, best_i, best_j = best_v[top], best_i[top], best_j[top]
+
+    order = np.lexsort((best_j, best_i, -best_v))  # |r| decrescente; empate na ordem das colunas
+    cols = num.columns
+    return [(cols[best_i[o]], cols[best_j[o]], float(min(best_v[o], 1.0))) for o in order]
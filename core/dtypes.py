@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+# Ajustes da compactação de dtypes
+_CATEGORY_MAX_RATIO = 0.5      # nunique/linhas máximo p/ virar category
+_CATEGORY_MIN_ROWS = 1000      # abaixo disso não compensa
+_STRING_KINDS = ("object", "string", "str")
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def _is_text(s: pd.Series) -> bool:
+    return str(s.dtype) in _STRING_KINDS or pd.api.types.is_string_dtype(s.dtype)
+
+
+def _downcast_numeric(s: pd.Series) -> pd.Series:
+    if pd.api.types.is_bool_dtype(s.dtype):
+        return s
+    if pd.api.types.is_integer_dtype(s.dtype):
+        kind = "unsigned" if len(s) and s.min() >= 0 else "integer"
+        return pd.to_numeric(s, downcast=kind)
+    if pd.api.types.is_float_dtype(s.dtype) and s.dtype != np.float32:
+        # float32 só se for exato (não perde precisão no round-trip)
+        s32 = s.astype(np.float32)
+        if np.array_equal(s32.to_numpy(dtype=np.float64), s.to_numpy(), equal_nan=True):
+            return s32
+    return s
+
+
+def _arrow_string_dtype():
+    try:
+        import pyarrow  # noqa: F401
+        return pd.StringDtype("pyarrow")
+    except Exception:
+        return None
+
+
+def optimize_dtypes(
+    df: pd.DataFrame,
+    downcast_numeric: bool = True,
+    categories: bool = True,
+    arrow_strings: bool = False,
+) -> tuple[pd.DataFrame, dict]:
+    """
+    Reduz memória do DataFrame: numéricas no menor tipo seguro, strings de baixa
+    cardinalidade em category e, opcionalmente, strings Arrow.
+    Retorna (df_otimizado, info) com bytes antes/depois e os dtypes originais
+    (para restore_dtypes na exportação).
+    """
+    before = frame_nbytes(df)
+    n_rows = int(df.shape[0])
+    string_dtype = _arrow_string_dtype() if arrow_strings else None
+
+    new_cols = {}
+    changes = {}
+    for c in df.columns:
+        s = df[c]
+        out = s
+        if downcast_numeric and pd.api.types.is_numeric_dtype(s.dtype):
+            out = _downcast_numeric(s)
+        elif _is_text(s):
+            nun = int(s.nunique(dropna=True))
+            if categories and n_rows >= _CATEGORY_MIN_ROWS and nun <= n_rows * _CATEGORY_MAX_RATIO:
+                out = s.astype("category")
+            elif string_dtype is not None:
+                out = s.astype(string_dtype)
+
+        if out.dtype != s.dtype:
+            new_cols[c] = out
+            changes[c] = {"original": str(s.dtype), "optimized": str(out.dtype)}
+
+    out_df = df.assign(**new_cols) if new_cols else df
+    return out_df, {
+        "mem_bytes_before": before,
+        "mem_bytes_after": frame_nbytes(out_df),
+        "dtype_changes": changes,
+    }
+
+
+def restore_dtypes(df: pd.DataFrame, dtype_changes: dict) -> pd.DataFrame:
+    """
+    Volta as colunas otimizadas à representação original (ex.: antes de exportar CSV).
+    Colunas removidas ou que mudaram de tipo depois (limpeza) são ignoradas.
+    """
+    restored = {}
+    for c, change in (dtype_changes or {}).items():
+        if c not in df.columns or str(df[c].dtype) != change["optimized"]:
+            continue
+        s = df[c]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            s = s.astype(s.cat.categories.dtype)
+        restored[c] = s.astype(change["original"])
+    return df.assign(**restored) if restored else df
@@ -0,0 +1,126 @@
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from core.dtypes import restore_dtypes
+
+# Ajustes da exportação (escrita em lotes num arquivo, nunca o CSV inteiro em memória)
+_EXPORT_CHUNK_ROWS = 50_000
+_EXPORT_DIR = os.path.join(tempfile.gettempdir(), "insightmind_exports")
+
+# formato -> (extensão, mime, compressão do stream Arrow)
+EXPORT_FORMATS = {
+    "csv": (".csv", "text/csv", None),
+    "csv.gz": (".csv.gz", "application/gzip", "gzip"),
+    "csv.zst": (".csv.zst", "application/zstd", "zstd"),
+    "parquet": (".parquet", "application/vnd.apache.parquet", None),
+}
+
+
+def _chunks(df: pd.DataFrame, dtype_changes: dict | None, chunk_rows: int):
+    # dtypes originais voltam por lote: nenhuma cópia do frame inteiro
+    for start in range(0, df.shape[0], chunk_rows):
+        yield restore_dtypes(df.iloc[start: start + chunk_rows], dtype_changes)
+
+
+_NS_PER_UNIT = [("D", 86_400 * 10**9), ("s", 10**9), ("ms", 10**6), ("us", 10**3)]
+_NS_PER_UNIT_NATIVE = {"s": 10**9, "ms": 10**6, "us": 10**3, "ns": 1}
+
+
+def _datetime_units(df: pd.DataFrame) -> dict:
+    """
+    Resolução do texto de cada coluna datetime (sem fuso), decidida no frame inteiro como o
+    to_csv faz (só data se tudo for meia-noite; frações só se existirem): por lote o pandas
+    decidiria de novo e o mesmo arquivo misturaria 2024-01-01 e 2024-01-03 10:30:00.
+    """
+    units = {}
+    for c in df.columns:
+        s = df[c]
+        if not pd.api.types.is_datetime64_dtype(s.dtype):
+            continue  # com fuso o to_csv formata valor a valor (não depende do lote)
+        arr = s.to_numpy()  # unidade nativa (ns, us...): sem overflow fora de 1677-2262
+        native = np.datetime_data(arr.dtype)[0]
+        step = _NS_PER_UNIT_NATIVE[native]
+        v = arr.view(np.int64)[s.notna().to_numpy()]
+        units[c] = next((u for u, ns in _NS_PER_UNIT if ns >= step and (v % (ns // step) == 0).all()), native)
+    return units
+
+
+def _format_datetimes(chunk: pd.DataFrame, units: dict) -> pd.DataFrame:
+    """Colunas datetime do lote como texto na resolução fixa do arquivo (NaT -> vazio)."""
+    text = {}
+    for c, unit in units.items():
+        s = chunk[c]
+        txt = np.datetime_as_string(s.to_numpy(), unit=unit)
+        txt = np.char.replace(txt, "T", " ").astype(object)
+        txt[s.isna().to_numpy()] = None
+        text[c] = txt
+    return chunk.assign(**text) if text else chunk
+
+
+def _write_csv(df: pd.DataFrame, path: str, compression: str | None, dtype_changes: dict | None, chunk_rows: int) -> None:
+    with pa.output_stream(path, compression=compression) as f:
+        if df.shape[0] == 0:
+            f.write(restore_dtypes(df, dtype_changes).to_csv(index=False).encode("utf-8"))
+            return
+        units = _datetime_units(df)
+        for i, chunk in enumerate(_chunks(df, dtype_changes, chunk_rows)):
+            f.write(_format_datetimes(chunk, units).to_csv(index=False, header=(i == 0)).encode("utf-8"))
+
+
+def _parquet_schema(df: pd.DataFrame, dtype_changes: dict | None) -> tuple[pa.Schema, list]:
+    """Schema do arquivo inteiro (tipos de um lote podem ser incompletos, ex.: coluna só com NaN)."""
+    fields, as_text = [], []
+    for c in df.columns:
+        col = restore_dtypes(df[[c]], dtype_changes)  # uma coluna por vez nos dtypes originais
+        try:
+            typ = pa.Schema.from_pandas(col, preserve_index=False).field(0).type
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            typ = pa.string()  # tipos mistos (ex.: números e textos): grava como texto
+            as_text.append(c)
+        fields.append(pa.field(str(c), typ))
+    return pa.schema(fields), as_text
+
+
+def _write_parquet(df: pd.DataFrame, path: str, dtype_changes: dict | None, chunk_rows: int) -> None:
+    schema, as_text = _parquet_schema(df, dtype_changes)
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in _chunks(df, dtype_changes, chunk_rows):
+            if as_text:
+                chunk = chunk.assign(**{c: chunk[c].astype(str).where(chunk[c].notna()) for c in as_text})
+            chunk.columns = [str(c) for c in chunk.columns]
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def export_frame(
+    df: pd.DataFrame,
+    fmt: str = "csv",
+    dtype_changes: dict | None = None,
+    path: str | None = None,
+    chunk_rows: int = _EXPORT_CHUNK_ROWS,
+) -> str:
+    """
+    Grava df em arquivo (CSV, CSV gzip/zstd ou Parquet) em lotes de chunk_rows linhas
+    e devolve o caminho. Sem path, cria um arquivo temporário (quem chama remove).
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Formato de exportação desconhecido: {fmt}")
+    ext, _, compression = EXPORT_FORMATS[fmt]
+    if path is None:
+        os.makedirs(_EXPORT_DIR, exist_ok=True)
+        fd, path = tempfile.mkstemp(suffix=ext, dir=_EXPORT_DIR)
+        os.close(fd)
+    try:
+        if fmt == "parquet":
+            _write_parquet(df, path, dtype_changes, chunk_rows)
+        else:
+            _write_csv(df, path, compression, dtype_changes, chunk_rows)
+    except Exception:
+        Path(path).unlink(missing_ok=True)
+        raise
+    return path
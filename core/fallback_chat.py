@@ -1,8 +1,8 @@
 import re
 import numpy as np
 import pandas as pd
-from core.insights import generate_auto_insights
-from core.profiler import make_quality_metrics, basic_summary
+from core.insights import insights_from_profile
+from core.profiler import DatasetProfile, ensure_profile
 
 TARGET_KEYWORDS = [
     "coluna alvo", "alvo", "target", "label", "y", "variável alvo", "variavel alvo",
@@ -13,25 +13,24 @@ def _looks_like_target_question(q: str) -> bool:
     q = q.lower().strip()
     return any(k in q for k in TARGET_KEYWORDS)
 
-def _target_candidates(df: pd.DataFrame) -> list[str]:
+def _target_candidates(profile: DatasetProfile) -> list[str]:
     """
     Heurística:
     - Evita colunas ID (id, uuid, code, codigo)
     - Evita colunas muito únicas (quase um identificador)
     - Prioriza colunas com menos cardinalidade (classificação) e também numéricas plausíveis (regressão)
     """
-    n = len(df)
-    cols = list(df.columns)
+    n = profile.n_rows
+    cols = list(profile.columns)
 
     def is_id_like(name: str) -> bool:
         name = name.lower()
         return any(tok in name for tok in ["id", "uuid", "cpf", "cnpj", "codigo", "code", "hash"])
 
     candidates = []
-    for c in cols:
+    for c, nunique in zip(cols, profile.n_unique):
         if is_id_like(c):
             continue
-        nunique = df[c].nunique(dropna=True)
         # muito único => parece ID
         if n > 0 and (nunique / n) > 0.95:
             continue
@@ -49,14 +48,16 @@ def _target_candidates(df: pd.DataFrame) -> list[str]:
     ranked = low_card + mid_card + high_card
     return ranked[:6]
 
-def offline_answer(question: str, df: pd.DataFrame) -> str:
-    qm = make_quality_metrics(df)
-    ins = generate_auto_insights(df, use_llm=False)
-    summ = basic_summary(df).head(25)
+def offline_answer(question: str, df: pd.DataFrame | DatasetProfile) -> str:
+    # Aceita o perfil já calculado: nenhuma varredura do dataset por pergunta
+    profile = ensure_profile(df)
+    qm = profile.quality_metrics()
+    ins = insights_from_profile(profile, use_llm=False)
+    summ = profile.summary().head(25)
 
     # ✅ Caso específico: pergunta de alvo/target
     if _looks_like_target_question(question):
-        cands = _target_candidates(df)
+        cands = _target_candidates(profile)
         lines = []
         lines.append("🟡 **Modo offline (sem LLM disponível)**")
         lines.append("")
@@ -67,8 +68,8 @@ def offline_answer(question: str, df: pd.DataFrame) -> str:
             lines.append("")
             lines.append("**Sugestões de colunas que podem ser alvo (candidatas):**")
             for c in cands:
-                dtype = str(df[c].dtype)
-                nunique = int(df[c].nunique(dropna=True))
+                dtype = profile.dtype_of(c)
+                nunique = int(profile.n_unique_of(c))
                 lines.append(f"- **{c}** (tipo: {dtype}, únicos: {nunique})")
             lines.append("")
             lines.append("Se você me disser o objetivo (classificação ou regressão) e qual resultado quer prever, eu te digo a melhor.")
@@ -0,0 +1,37 @@
+import hashlib
+import weakref
+
+import pandas as pd
+
+from core.rowhash import frame_signature, row_hash_index
+
+# Fingerprint por DataFrame vivo (id -> (assinatura, hash)); a entrada some quando o frame é coletado
+_FP_CACHE: dict[int, tuple] = {}
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """Hash de conteúdo do frame (colunas, tipos e hashes de linha). Custo O(n), uma vez."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr([(str(c), str(dt)) for c, dt in df.dtypes.items()]).encode("utf-8"))
+    h.update(row_hash_index(df).hashes.tobytes())
+    return h.hexdigest()
+
+
+def set_fingerprint(df: pd.DataFrame, fp: str) -> str:
+    """Associa um fingerprint já conhecido (ex.: hash do CSV bruto) ao frame."""
+    key = id(df)
+    if key not in _FP_CACHE:
+        weakref.finalize(df, _FP_CACHE.pop, key, None)
+    _FP_CACHE[key] = (frame_signature(df), fp)
+    return fp
+
+
+def fingerprint(df: pd.DataFrame) -> str:
+    """
+    Identidade do dataset para chaves de cache: calculada uma vez por frame e
+    reaproveitada enquanto a assinatura barata (forma, tipos, linhas amostradas) não mudar.
+    """
+    hit = _FP_CACHE.get(id(df))
+    if hit is not None and hit[0] == frame_signature(df):
+        return hit[1]
+    return set_fingerprint(df, frame_fingerprint(df))
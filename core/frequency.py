@@ -0,0 +1,101 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from core.fingerprint import fingerprint
+
+# Ajustes do índice de frequências (colunas categóricas)
+_FREQ_TOP_K = 20          # top categorias guardadas por coluna
+_FREQ_CACHE_MAX = 8       # índices guardados (LRU por fingerprint)
+_NULL_LABEL = "nan"       # rótulo dos nulos nas contagens (como astype(str))
+
+_FREQ_CACHE: "OrderedDict[tuple, FrequencyIndex]" = OrderedDict()
+
+
+@dataclass
+class ColumnFrequency:
+    name: object
+    n_rows: int
+    n_null: int
+    n_unique: int  # distintos não-nulos (exato)
+    top: dict = field(default_factory=dict)  # rótulo (str) -> contagem, nulos incluídos, decrescente
+
+    @property
+    def n_non_null(self) -> int:
+        return self.n_rows - self.n_null
+
+    def top_frame(self, k: int = _FREQ_TOP_K) -> pd.DataFrame:
+        """Top k categorias no formato de gráfico de barras (coluna, count)."""
+        items = list(self.top.items())[:k]
+        return pd.DataFrame({self.name: [t[0] for t in items], "count": [t[1] for t in items]})
+
+
+def column_frequency(s: pd.Series, top_k: int = _FREQ_TOP_K) -> ColumnFrequency:
+    """
+    Uma varredura da coluna (value_counts sobre os valores originais) dá nulos,
+    cardinalidade exata e top-k de uma vez.
+    """
+    try:
+        vc = s.value_counts(dropna=False, sort=False)
+    except TypeError:
+        # valores não-hasheáveis (listas, dicts...)
+        vc = s.astype(str).value_counts(dropna=False, sort=False)
+    vc = vc[vc.to_numpy() > 0]  # categorias não usadas de colunas category
+    is_null = np.asarray(pd.isna(vc.index), dtype=bool)
+    top = {}
+    for k, v in vc.nlargest(top_k, keep="first").items():
+        label = _NULL_LABEL if pd.isna(k) else str(k)
+        top[label] = top.get(label, 0) + int(v)
+    return ColumnFrequency(
+        name=s.name,
+        n_rows=int(s.shape[0]),
+        n_null=int(vc.to_numpy()[is_null].sum()),
+        n_unique=int((~is_null).sum()),
+        top=dict(sorted(top.items(), key=lambda t: -t[1])),
+    )
+
+
+class FrequencyIndex:
+    """
+    Frequências das colunas categóricas (não numéricas) de um dataset, uma varredura
+    por coluna: gráficos de barras, limites de cardinalidade, resumo e candidatos a
+    alvo leem daqui em vez de repetir nunique/value_counts.
+    """
+
+    def __init__(self, df: pd.DataFrame, top_k: int = _FREQ_TOP_K):
+        self.n_rows = int(df.shape[0])
+        self.top_k = int(top_k)
+        self.columns: dict = {}
+        for j, dt in enumerate(df.dtypes):
+            if not pd.api.types.is_numeric_dtype(dt) or pd.api.types.is_bool_dtype(dt):
+                s = df.iloc[:, j]
+                self.columns[s.name] = column_frequency(s, top_k)
+
+    def __contains__(self, col) -> bool:
+        return col in self.columns
+
+    def __getitem__(self, col) -> ColumnFrequency:
+        return self.columns[col]
+
+    def n_unique(self, col) -> int:
+        return self.columns[col].n_unique
+
+    def top(self, col, k: int | None = None) -> dict:
+        top = self.columns[col].top
+        return top if k is None else dict(list(top.items())[:k])
+
+
+def frequency_index(df: pd.DataFrame, top_k: int = _FREQ_TOP_K) -> FrequencyIndex:
+    """Índice de frequências guardado por (fingerprint, top_k): construído uma vez por dataset."""
+    key = (fingerprint(df), int(top_k))
+    hit = _FREQ_CACHE.get(key)
+    if hit is not None:
+        _FREQ_CACHE.move_to_end(key)
+        return hit
+    index = FrequencyIndex(df, top_k=top_k)
+    _FREQ_CACHE[key] = index
+    while len(_FREQ_CACHE) > _FREQ_CACHE_MAX:
+        _FREQ_CACHE.popitem(last=False)
+    return index
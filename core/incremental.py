@@ -0,0 +1,66 @@
+import pickle
+from pathlib import Path
+
+import pandas as pd
+
+from core.cleaning import CleaningPlan
+from core.insights import insights_from_profile
+from core.profiler import DatasetProfile
+from core.streaming import _SAMPLE_ROWS, StreamingProfile
+
+
+class IncrementalDataset:
+    """
+    Dataset que cresce por appends diários: o perfil guarda só estatísticas combináveis
+    (contagens, missing, momentos, HLL, hashes de linha, co-momentos p/ correlação),
+    então cada append custa O(lote). Com um plano de limpeza, append() devolve também
+    o delta limpo com os parâmetros já ajustados (o 1º lote ajusta o plano se preciso).
+    """
+
+    def __init__(self, plan: CleaningPlan | None = None, sample_rows: int = _SAMPLE_ROWS):
+        self.stats = StreamingProfile(sample_rows=sample_rows)
+        self.plan = plan
+        self.n_batches = 0
+
+    @property
+    def n_rows(self) -> int:
+        return self.stats.n_rows
+
+    def append(self, batch: pd.DataFrame) -> tuple[pd.DataFrame | None, list[str]]:
+        """Soma o lote ao perfil e devolve (delta_limpo, log); sem plano, (None, [])."""
+        dup = self.stats.update(batch)  # linhas repetidas no lote ou em lotes anteriores
+        self.n_batches += 1
+        if self.plan is None:
+            return None, []
+
+        log = []
+        fresh = batch
+        if self.plan.remove_duplicates and dup.any():
+            fresh = batch.loc[~dup]
+            log.append(f"Removidas duplicadas: {int(dup.sum())} linhas.")
+        if not self.plan.fitted:
+            cleaned, step_log = self.plan.fit_transform(fresh)
+        else:
+            cleaned, step_log = self.plan.transform(fresh)
+        log.extend(line for line in step_log if not line.startswith("Removidas duplicadas"))
+        return cleaned, log
+
+    def profile(self) -> DatasetProfile:
+        return self.stats.to_profile()
+
+    def quality_metrics(self) -> dict:
+        return self.stats.quality_metrics()
+
+    def summary(self) -> pd.DataFrame:
+        return self.stats.summary()
+
+    def insights(self, use_llm: bool = False) -> list[str]:
+        return insights_from_profile(self.profile(), use_llm=use_llm)
+
+    def save(self, path) -> None:
+        """Estado completo (perfil + plano) para continuar os appends em outra execução."""
+        Path(path).write_bytes(pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL))
+
+    @classmethod
+    def load(cls, path) -> "IncrementalDataset":
+        return pickle.loads(Path(path).read_bytes())
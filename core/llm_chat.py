@@ -4,6 +4,8 @@ import pandas as pd
 from openai import OpenAI
 from openai import RateLimitError, AuthenticationError, APIConnectionError, BadRequestError, APIStatusError
 from core.offline_chat import offline_answer
+from core.insights import insights_from_profile
+from core.profiler import DatasetProfile, ensure_profile
 
 def _openai_client() -> OpenAI:
     api_key = st.secrets.get("OPENAI_API_KEY", None)
@@ -11,17 +13,19 @@ def _openai_client() -> OpenAI:
         raise RuntimeError("OPENAI_API_KEY ausente")
     return OpenAI(api_key=api_key)
 
-def _build_context(df: pd.DataFrame, quality_metrics: dict, auto_insights: list[str], summary_table: pd.DataFrame) -> dict:
+def _build_context(profile: DatasetProfile) -> dict:
+    # Tudo sai do perfil: montar o contexto não varre o dataset
+    summary_table = profile.summary()
     summary_records = []
-    if summary_table is not None and not summary_table.empty:
+    if not summary_table.empty:
         summary_records = summary_table.head(30).to_dict(orient="records")
     return {
-        "shape": {"rows": int(df.shape[0]), "cols": int(df.shape[1])},
-        "columns": list(df.columns)[:100],
-        "quality_metrics": quality_metrics or {},
-        "auto_insights": (auto_insights or [])[:20],
+        "shape": {"rows": int(profile.n_rows), "cols": int(profile.n_cols)},
+        "columns": list(profile.columns)[:100],
+        "quality_metrics": profile.quality_metrics(),
+        "auto_insights": insights_from_profile(profile)[:20],
         "summary_table_sample": summary_records,
-        "sample_rows": df.head(10).to_dict(orient="records"),
+        "sample_rows": profile.sample_records,
     }
 
 def _system_prompt() -> str:
@@ -30,7 +34,7 @@ def _system_prompt() -> str:
 def _answer_with_openai(question: str, context: dict) -> str:
     model = st.secrets.get("OPENAI_MODEL", "gpt-3.5-turbo") # ou seu modelo preferido
     client = _openai_client()
-    context_json = json.dumps(context, ensure_ascii=False)
+    context_json = json.dumps(context, ensure_ascii=False, default=str)
 
     # ✅ Corrigido para a API estável atual
     resp = client.chat.completions.create(
@@ -42,11 +46,12 @@ def _answer_with_openai(question: str, context: dict) -> str:
     )
     return resp.choices[0].message.content.strip()
 
-def dataset_chat_answer(question: str, df: pd.DataFrame, quality_metrics: dict, auto_insights: list[str], summary_table: pd.DataFrame, provider: str = "auto") -> str:
-    context = _build_context(df, quality_metrics, auto_insights, summary_table)
-    
+def dataset_chat_answer(question: str, df: pd.DataFrame | DatasetProfile, provider: str = "auto") -> str:
+    profile = ensure_profile(df)
+    context = _build_context(profile)
+
     if provider == "offline":
-        return offline_answer(question, df, quality_metrics, auto_insights, summary_table)
+        return offline_answer(question, profile)
 
     if provider in ("auto", "openai"):
         try:
@@ -55,4 +60,4 @@ def dataset_chat_answer(question: str, df: pd.DataFrame, quality_metrics: dict,
             if provider == "openai": return f"⚠️ Erro OpenAI: {e}"
     
     # Fallback para offline caso tudo falhe
-    return offline_answer(question, df, quality_metrics, auto_insights, summary_table)
\ No newline at end of file
+    return offline_answer(question, profile)
\ No newline at end of file
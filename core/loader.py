@@ -1,39 +1,295 @@
+import csv
+import re
 import pandas as pd
-from io import BytesIO
+from io import BytesIO, StringIO
 
-def load_csv_smart(uploaded_file):
-    raw = uploaded_file.read()
-    meta = {}
+from core.dtypes import optimize_dtypes
 
-    for enc in ["utf-8", "latin1", "cp1252"]:
+# Ajustes do sniffing (dialeto/encoding a partir de um prefixo limitado)
+_ENCODINGS = ["utf-8", "latin1", "cp1252"]
+_SEPS = [",", ";", "\t", "|"]
+_SNIFF_PREFIX_BYTES = 256 * 1024   # prefixo analisado
+_SNIFF_SAMPLE_BYTES = 32 * 1024    # tamanho de cada amostra no meio do arquivo
+_SNIFF_N_SAMPLES = 3               # amostras extras ao longo do arquivo
+_SNIFF_MAX_LINES = 2000            # linhas analisadas por trecho
+_SNIFF_MIN_CONFIDENCE = 0.8        # abaixo disso, cai no fallback (um parse por separador)
+
+_NUM_DOT = re.compile(r"^[-+]?\d+\.\d+$")
+_NUM_COMMA = re.compile(r"^[-+]?\d+,\d+$")
+_NUM_ANY = re.compile(r"^[-+]?(\d+([.,]\d*)?|[.,]\d+)([eE][-+]?\d+)?$")
+
+
+def _cut_lines(chunk: bytes, skip_first: bool) -> bytes:
+    """Recorta o trecho em linhas completas (descarta a última parcial e, se pedido, a primeira)."""
+    if skip_first:
+        nl = chunk.find(b"\n")
+        chunk = chunk[nl + 1:] if nl >= 0 else b""
+    nl = chunk.rfind(b"\n")
+    return chunk[: nl + 1] if nl >= 0 else chunk
+
+
+def _sniff_chunks(raw: bytes) -> list[bytes]:
+    """Prefixo + algumas amostras espalhadas pelo arquivo (todas em linhas completas)."""
+    if len(raw) <= _SNIFF_PREFIX_BYTES:
+        return [raw]
+
+    chunks = [_cut_lines(raw[:_SNIFF_PREFIX_BYTES], skip_first=False)]
+    for i in range(1, _SNIFF_N_SAMPLES + 1):
+        off = len(raw) * i // (_SNIFF_N_SAMPLES + 1)
+        chunks.append(_cut_lines(raw[off: off + _SNIFF_SAMPLE_BYTES], skip_first=True))
+    return [c for c in chunks if c]
+
+
+def _sniff_chunks_stream(f) -> list[bytes]:
+    """Igual a _sniff_chunks, mas lendo só os trechos necessários de um arquivo com seek."""
+    f.seek(0, 2)
+    size = f.tell()
+    f.seek(0)
+    if size <= _SNIFF_PREFIX_BYTES:
+        chunks = [f.read()]
+    else:
+        chunks = [_cut_lines(f.read(_SNIFF_PREFIX_BYTES), skip_first=False)]
+        for i in range(1, _SNIFF_N_SAMPLES + 1):
+            f.seek(size * i // (_SNIFF_N_SAMPLES + 1))
+            chunks.append(_cut_lines(f.read(_SNIFF_SAMPLE_BYTES), skip_first=True))
+    f.seek(0)
+    return [c for c in chunks if c]
+
+
+def _decode_chunks(chunks: list[bytes]) -> tuple[str, list[str]]:
+    for enc in _ENCODINGS:
         try:
-            raw.decode(enc)
-            meta["encoding"] = enc
-            break
+            return enc, [c.decode(enc) for c in chunks]
         except UnicodeDecodeError:
             continue
-    else:
-        meta["encoding"] = "utf-8"
+    return "utf-8", [c.decode("utf-8", errors="replace") for c in chunks]
+
+
+def _guess_quotechar(text: str, sep: str) -> str:
+    if '"' in text:
+        return '"'
+    # ' só quando envolve um campo inteiro ('a, b' entre separadores); apóstrofo solto
+    # (O'Brien, '90s, '80) não conta
+    s = re.escape(sep)
+    if re.search(rf"(?:^|{s})'[^'\n]*'(?:{s}|\r?$)", text, flags=re.MULTILINE):
+        return "'"
+    return '"'
+
+
+def _rows(text: str, sep: str, quotechar: str) -> list[list[str]]:
+    rows = []
+    try:
+        for i, row in enumerate(csv.reader(StringIO(text), delimiter=sep, quotechar=quotechar)):
+            if i >= _SNIFF_MAX_LINES:
+                break
+            if row:
+                rows.append(row)
+    except csv.Error:
+        pass
+    return rows
+
+
+def _consistency(rows: list[list[str]]) -> tuple[float, int]:
+    """Fração de linhas com a quantidade modal de campos + essa quantidade."""
+    if not rows:
+        return 0.0, 0
+    counts: dict[int, int] = {}
+    for r in rows:
+        counts[len(r)] = counts.get(len(r), 0) + 1
+    n_fields, hits = max(counts.items(), key=lambda kv: (kv[1], kv[0]))
+    return hits / len(rows), n_fields
+
+
+def _guess_decimal(rows: list[list[str]], sep: str) -> str:
+    if sep == ",":
+        return "."
+    dot = comma = 0
+    for r in rows[1:]:
+        for v in r:
+            v = v.strip()
+            if _NUM_COMMA.match(v):
+                comma += 1
+            elif _NUM_DOT.match(v):
+                dot += 1
+    return "," if comma > dot else "."
+
+
+def _guess_header(rows: list[list[str]]) -> int | None:
+    """Primeira linha é cabeçalho se tiver texto onde o resto é numérico (padrão: cabeçalho)."""
+    if len(rows) < 2:
+        return 0
+    first, rest = rows[0], rows[1:]
+    votes = 0
+    for j, v in enumerate(first):
+        col = [r[j].strip() for r in rest if j < len(r) and r[j].strip()]
+        if not col:
+            continue
+        num_rate = sum(bool(_NUM_ANY.match(x)) for x in col) / len(col)
+        if num_rate < 0.9:
+            continue
+        votes += -1 if _NUM_ANY.match(v.strip()) else 1
+    return None if votes < 0 else 0
+
+
+def _sniff_from_chunks(chunks: list[bytes]) -> dict:
+    enc, texts = _decode_chunks(chunks)
+    prefix = texts[0] if texts else ""
+
+    scored = []
+    for sep in _SEPS:
+        quotechar = _guess_quotechar(prefix, sep)
+        all_rows = [_rows(t, sep, quotechar) for t in texts]
+        rows = [r for chunk in all_rows for r in chunk]
+        cons, n_fields = _consistency(rows)
+        scored.append((cons if n_fields > 1 else 0.0, n_fields, sep, quotechar, all_rows[0] if all_rows else [], cons))
+
+    # Nenhum separador gera mais de uma coluna: arquivo de coluna única (confiança = consistência real)
+    single = all(n <= 1 for _, n, *_ in scored)
+    scored.sort(key=lambda t: (t[0], t[1]), reverse=True)
+    if single:
+        scored = [next(t for t in scored if t[2] == ",")]
+        scored[0] = (scored[0][5],) + scored[0][1:]
+    cons, n_fields, sep, quotechar, prefix_rows, _ = scored[0]
+
+    # Ambíguo: outro separador também é consistente e lê a mesma tabela (mesmo nº de
+    # colunas, cabeçalho incluído); vírgula decimal ou em texto não bate no cabeçalho
+    confidence = cons
+    if any(
+        c >= 0.9 and n > 1 and n == n_fields and rows and len(rows[0]) == n
+        for c, n, _, _, rows, _ in scored[1:]
+    ):
+        confidence *= 0.5
 
-    seps = [",", ";", "\t", "|"]
+    return {
+        "encoding": enc,
+        "sep": sep,
+        "quotechar": quotechar,
+        "decimal": _guess_decimal(prefix_rows, sep),
+        "header": _guess_header(prefix_rows),
+        "n_fields": n_fields,
+        "sniff_confidence": round(float(confidence), 3),
+    }
+
+
+def sniff_csv(raw: bytes) -> dict:
+    """
+    Detecta encoding, separador, aspas, decimal e cabeçalho olhando só um prefixo
+    limitado do arquivo (mais algumas amostras do meio), sem parse completo.
+    """
+    return _sniff_from_chunks(_sniff_chunks(raw))
+
+
+def sniff_csv_stream(f) -> dict:
+    """sniff_csv para arquivos abertos (binário, com seek), sem ler o arquivo inteiro."""
+    return _sniff_from_chunks(_sniff_chunks_stream(f))
+
+
+def _count_lines(raw: bytes) -> int:
+    """Linhas não vazias do arquivo (aproximação sem decodificar; read_csv ignora linhas em branco)."""
+    n = raw.count(b"\n") + (0 if raw.endswith(b"\n") else 1)
+    return n - raw.count(b"\n\n") - raw.count(b"\r\n\r\n")
+
+
+def _read_full_fallback(raw: bytes, meta: dict) -> pd.DataFrame:
+    """
+    Comportamento antigo: um parse completo por separador candidato, fica o de mais colunas.
+    Para cada separador testa as aspas do sniffing e o padrão '"', preferindo o parse em que
+    o nº de linhas bate com o arquivo (aspas erradas juntam linhas).
+    """
     best = None
-    best_cols = 0
+    best_key = (0, False)
 
-    for sep in seps:
-        try:
-            df_try = pd.read_csv(BytesIO(raw), sep=sep, encoding=meta["encoding"])
-            if df_try.shape[1] > best_cols:
-                best_cols = df_try.shape[1]
-                best = (sep, df_try)
-        except Exception:
-            pass
+    # decimal do sniffing continua valendo (só se não colidir com o separador)
+    quotechars = list(dict.fromkeys([meta.get("quotechar", '"'), '"']))
+    sniffed_decimal = meta.get("decimal", ".")
+    expected_rows = _count_lines(raw) - 1  # menos o cabeçalho
+    for sep in _SEPS:
+        decimal = sniffed_decimal if sniffed_decimal != sep else "."
+        for quotechar in quotechars:
+            try:
+                df_try = pd.read_csv(BytesIO(raw), sep=sep, encoding=meta["encoding"], quotechar=quotechar, decimal=decimal)
+            except Exception:
+                continue
+            key = (df_try.shape[1], df_try.shape[0] == expected_rows)
+            if key > best_key:
+                best_key = key
+                best = (sep, decimal, quotechar, df_try)
 
     if best is None:
         df = pd.read_csv(BytesIO(raw), encoding=meta["encoding"])
         meta["sep"] = "auto"
+        meta["quotechar"] = '"'
+        meta["decimal"] = "."
     else:
-        meta["sep"] = best[0]
-        df = best[1]
+        meta["sep"], meta["decimal"], meta["quotechar"], df = best
+    meta["header"] = 0
+    return df
+
+
+def stream_fallback_dialect(f, meta: dict) -> dict:
+    """
+    Sniff de baixa confiança em arquivo lido em lotes: o parse por separador do fallback
+    roda só no prefixo (o arquivo inteiro não é carregado) e corrige o dialeto em meta.
+    """
+    sniffed = dict(meta)
+    _read_full_fallback(_sniff_chunks_stream(f)[0], meta)
+    if meta["sep"] == "auto":
+        meta.update(sep=sniffed["sep"], quotechar=sniffed["quotechar"], decimal=sniffed["decimal"])
+    meta["header"] = sniffed["header"] if meta["sep"] == sniffed["sep"] else 0
+    return meta
+
+
+def _full_encoding(raw: bytes, enc: str) -> str:
+    """O prefixo pode ser utf-8 válido e o resto não: confirma antes do parse completo."""
+    for cand in [enc] + [e for e in _ENCODINGS if e != enc]:
+        try:
+            raw.decode(cand)
+            return cand
+        except UnicodeDecodeError:
+            continue
+    return "utf-8"
+
+
+def _read_sniffed(raw: bytes, meta: dict) -> pd.DataFrame:
+    return pd.read_csv(
+        BytesIO(raw),
+        sep=meta["sep"],
+        encoding=meta["encoding"],
+        quotechar=meta["quotechar"],
+        decimal=meta["decimal"],
+        header=meta["header"],
+    )
+
+
+def load_csv_bytes(raw: bytes, optimize: bool = False):
+    meta = sniff_csv(raw)
 
-    df.columns = [c.strip() for c in df.columns]
+    df = None
+    if meta["sniff_confidence"] >= _SNIFF_MIN_CONFIDENCE:
+        try:
+            try:
+                df = _read_sniffed(raw, meta)
+            except UnicodeDecodeError:
+                meta["encoding"] = _full_encoding(raw, meta["encoding"])
+                df = _read_sniffed(raw, meta)
+            meta["sniff_method"] = "prefix"
+        except Exception:
+            df = None
+
+    if df is None:
+        meta["encoding"] = _full_encoding(raw, meta["encoding"])
+        df = _read_full_fallback(raw, meta)
+        meta["sniff_method"] = "fallback"
+
+    if meta["header"] is None:
+        df.columns = [f"coluna_{i + 1}" for i in range(df.shape[1])]
+    df.columns = [str(c).strip() for c in df.columns]
+
+    if optimize:
+        df, info = optimize_dtypes(df)
+        meta.update(info)
     return df, meta
+
+
+def load_csv_smart(uploaded_file, optimize: bool = False):
+    return load_csv_bytes(uploaded_file.read(), optimize=optimize)
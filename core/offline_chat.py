@@ -3,60 +3,61 @@ from __future__ import annotations
 import re
 import pandas as pd
 
+from core.profiler import DatasetProfile, ensure_profile
+
 # --- 1. FUNÇÕES DE SUPORTE (Devem vir antes da offline_answer) ---
 
-def _basic_shape(df: pd.DataFrame) -> tuple[int, int]:
-    return df.shape[0], df.shape[1]
+def _basic_shape(profile: DatasetProfile) -> tuple[int, int]:
+    return profile.n_rows, profile.n_cols
 
-def _detect_target(df: pd.DataFrame) -> list[str]:
+def _detect_target(columns: list) -> list[str]:
     """Tenta identificar a coluna alvo por nomes comuns."""
     common_targets = [
-        "target", "label", "alvo", "class", "classe", "status", "churn", 
+        "target", "label", "alvo", "class", "classe", "status", "churn",
         "price", "preco", "venda", "valor", "outcome", "resultado"
     ]
-    found = [col for col in df.columns if any(t in str(col).lower() for t in common_targets)]
-    return found if found else [df.columns[-1]]
+    found = [col for col in columns if any(t in str(col).lower() for t in common_targets)]
+    return found if found else [columns[-1]]
 
-def _get_correlations(df: pd.DataFrame):
-    df_num = df.select_dtypes(include=['number'])
-    if df_num.shape[1] < 2: return {}
-    corr = df_num.corr().unstack()
-    high_corr = corr[(abs(corr) > 0.7) & (abs(corr) < 1.0)].drop_duplicates()
-    return high_corr.head(5).to_dict()
+def _get_correlations(profile: DatasetProfile):
+    high_corr = {(a, b): r for a, b, r in profile.top_correlations if 0.7 < r < 1.0}
+    return dict(list(high_corr.items())[:5])
 
 # --- 2. FUNÇÃO PRINCIPAL ---
 
 def offline_answer(
     question: str,
-    df: pd.DataFrame,
+    df: pd.DataFrame | DatasetProfile,
     quality_metrics: dict | None = None,
     auto_insights: list | str | None = None,
     summary_table: pd.DataFrame | None = None,
 ) -> str:
     q = (question or "").strip().lower()
+    # Perfil já calculado => respostas sem varrer o dataset
+    profile = ensure_profile(df)
 
     # Se a pergunta for sobre duplicados
     if any(word in q for word in ["duplicado", "repetido", "duplicate"]):
-        dups = df.duplicated().sum()
+        dups = profile.duplicate_rows or 0
         if dups == 0:
             return "✅ **Limpeza**: Não foram encontradas linhas duplicadas."
         return f"⚠️ **Atenção**: Existem **{dups} linhas duplicadas**."
 
     # Se a pergunta for sobre resumo estatístico
     if any(word in q for word in ["resumo", "estatistica", "describe"]):
-        desc = df.describe().T
+        desc = pd.DataFrame.from_dict(profile.describe, orient="index")
         try:
             return "📊 **Resumo Estatístico**:\n\n" + desc.to_markdown()
         except:
             return "📊 **Resumo Estatístico**:\n\n```\n" + str(desc) + "\n```"
 
     # RESPOSTA PADRÃO (Onde estava dando o erro)
-    n_rows, n_cols = _basic_shape(df)
-    
+    n_rows, n_cols = _basic_shape(profile)
+
     # Agora a função _detect_target já foi definida acima, então não dará erro
-    targets = _detect_target(df)
+    targets = _detect_target(profile.columns)
     target_col = targets[0]
-    
+
     return (
         f"📊 **Conjunto de dados com {n_rows} linhas e {n_cols} colunas.**\n\n"
         f"🎯 **Coluna Alvo provável**: `{target_col}`\n\n"
@@ -64,4 +65,4 @@ def offline_answer(
         "- 'Existem valores **duplicados**?'\n"
         "- 'Quais são os valores **nulos**?'\n"
         "- 'Me mostre o **resumo estatístico**.'"
-    )
\ No newline at end of file
+    )
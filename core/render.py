@@ -0,0 +1,113 @@
+import atexit
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+# Ajustes da exportação de gráficos para PNG (kaleido)
+_PNG_WIDTH = int(os.environ.get("INSIGHTMIND_PNG_WIDTH", "1200"))   # largura padrão (px)
+_PNG_HEIGHT = int(os.environ.get("INSIGHTMIND_PNG_HEIGHT", "900"))  # altura padrão (px)
+_PNG_SCALE = float(os.environ.get("INSIGHTMIND_PNG_SCALE", "2"))    # fator de escala (resolução)
+_RENDER_WORKERS = int(os.environ.get("INSIGHTMIND_RENDER_WORKERS", "0"))  # 0 = nº de CPUs (máx. 4)
+_PNG_CACHE_MAX = 64  # PNGs guardados (LRU por fingerprint + gráfico + coluna + resolução)
+
+_PNG_CACHE: "OrderedDict[tuple, bytes]" = OrderedDict()
+_POOL: ProcessPoolExecutor | None = None
+
+
+def _warm_renderer() -> None:
+    """Inicializador do processo: sobe o kaleido uma vez para os próximos PNGs saírem quentes."""
+    try:
+        pio.to_image(go.Figure(), format="png", width=16, height=16)
+    except Exception:
+        pass  # kaleido ausente: o erro aparece no render de verdade
+
+
+def _render_png(fig_json: str, width: int, height: int, scale: float) -> bytes:
+    """Executado no processo do pool: figura (JSON) -> PNG."""
+    return pio.from_json(fig_json).to_image(format="png", width=width, height=height, scale=scale)
+
+
+def _render_pool() -> ProcessPoolExecutor:
+    """Pool persistente (criado no 1º uso e mantido entre cliques/reruns)."""
+    global _POOL
+    if _POOL is None:
+        workers = _RENDER_WORKERS or min(4, os.cpu_count() or 1)
+        # spawn: o servidor do Streamlit tem threads, fork não é seguro
+        _POOL = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_renderer,
+        )
+        atexit.register(_POOL.shutdown, wait=False, cancel_futures=True)
+    return _POOL
+
+
+def _reset_pool() -> None:
+    global _POOL
+    if _POOL is not None:
+        _POOL.shutdown(wait=False, cancel_futures=True)
+    _POOL = None
+
+
+def render_pngs(
+    jobs: list[tuple],
+    width: int = _PNG_WIDTH,
+    height: int = _PNG_HEIGHT,
+    scale: float = _PNG_SCALE,
+) -> list:
+    """
+    jobs = [(chave, construtor)], chave = (fingerprint, tipo_gráfico, coluna).
+    Devolve, na ordem dos jobs, PNG (bytes), None (construtor sem figura) ou a exceção.
+    PNGs em cache saem sem montar a figura; os demais são renderizados em paralelo.
+    """
+    results: list = [None] * len(jobs)
+    pending: dict[int, tuple] = {}
+    for i, (key, build) in enumerate(jobs):
+        cache_key = (*key, int(width), int(height), float(scale))
+        if cache_key in _PNG_CACHE:
+            _PNG_CACHE.move_to_end(cache_key)
+            results[i] = _PNG_CACHE[cache_key]
+            continue
+        try:
+            fig = build()
+        except Exception as e:
+            results[i] = e
+            continue
+        if fig is not None:
+            pending[i] = (cache_key, fig.to_json())
+
+    if not pending:
+        return results
+
+    futures = {}
+    if len(pending) > 1:
+        try:
+            pool = _render_pool()
+            futures = {i: pool.submit(_render_png, js, width, height, scale) for i, (_, js) in pending.items()}
+        except Exception:
+            _reset_pool()  # sem processos (ambiente restrito): renderiza aqui mesmo
+            futures = {}
+
+    for i, (cache_key, js) in pending.items():
+        try:
+            if i in futures:
+                try:
+                    png = futures[i].result()
+                except BrokenProcessPool:
+                    _reset_pool()
+                    png = _render_png(js, width, height, scale)
+            else:
+                png = _render_png(js, width, height, scale)
+        except Exception as e:
+            results[i] = e
+            continue
+        results[i] = png
+        _PNG_CACHE[cache_key] = png
+        while len(_PNG_CACHE) > _PNG_CACHE_MAX:
+            _PNG_CACHE.popitem(last=False)
+    return results
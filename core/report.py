@@ -4,13 +4,18 @@ from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from reportlab.lib.utils import ImageReader
 
+from core.insights import insights_from_profile
+from core.profiler import DatasetProfile
+
 
 def build_html_report(
-    df: pd.DataFrame,
-    quality_metrics: dict,
-    insights: list[str],
+    profile: DatasetProfile,
+    df: pd.DataFrame | None = None,
     include_profiling: bool = True,
 ) -> bytes:
+    # Métricas e insights vêm do perfil; o DataFrame só é usado pelo ydata-profiling
+    quality_metrics = profile.quality_metrics()
+    insights = insights_from_profile(profile)
     parts: list[str] = []
     parts.append("<html><head><meta charset='utf-8'><title>Relatório InsightMind</title></head><body>")
     parts.append("<h1>Relatório InsightMind</h1>")
@@ -23,7 +28,7 @@ def build_html_report(
         parts.append("<li>" + _escape_html(x) + "</li>")
     parts.append("</ul>")
 
-    if include_profiling:
+    if include_profiling and df is not None:
         parts.append("<hr/>")
         try:
             # Lazy import: evita derrubar o app no startup se o profiling estiver quebrado
@@ -48,11 +53,11 @@ def build_html_report(
 
 
 def build_pdf_report(
-    df: pd.DataFrame,
-    quality_metrics: dict,
-    insights: list[str],
+    profile: DatasetProfile,
     figs_png: list[bytes],
 ) -> bytes:
+    quality_metrics = profile.quality_metrics()
+    insights = insights_from_profile(profile)
     buf = BytesIO()
     c = canvas.Canvas(buf, pagesize=A4)
     w, h = A4
@@ -63,7 +68,7 @@ def build_pdf_report(
     y -= 28
 
     c.setFont("Helvetica", 11)
-    c.drawString(40, y, f"Linhas: {df.shape[0]} | Colunas: {df.shape[1]}")
+    c.drawString(40, y, f"Linhas: {profile.n_rows} | Colunas: {profile.n_cols}")
     y -= 24
 
     c.setFont("Helvetica-Bold", 12)
@@ -0,0 +1,141 @@
+import weakref
+
+import numpy as np
+import pandas as pd
+
+# Índices por DataFrame vivo (id -> (assinatura, índice)); a entrada some quando o frame é coletado
+_INDEX_CACHE: dict[int, tuple] = {}
+_SIGNATURE_ROWS = 64  # linhas conferidas na validação barata dos caches por frame
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """Hash 64-bit de cada linha (vetorizado, combina todas as colunas)."""
+    try:
+        return pd.util.hash_pandas_object(df, index=False).to_numpy(dtype=np.uint64)
+    except TypeError:
+        # valores não-hasheáveis (listas, dicts...): compara pela representação em texto
+        return pd.util.hash_pandas_object(df.astype(str).where(df.notna()), index=False).to_numpy(dtype=np.uint64)
+
+
+_NULL_HASH = np.uint64(0xFFFFFFFFFFFFFFFF)  # hash de nulo igual para qualquer dtype
+_HASH_MULT = np.uint64(0x100000001B3)        # mistura das colunas (FNV)
+
+
+def _column_hashes(s: pd.Series) -> np.ndarray:
+    """Hash dos valores independente do dtype do lote: numéricas como float64, bool/texto como objeto."""
+    if pd.api.types.is_numeric_dtype(s.dtype) and not pd.api.types.is_bool_dtype(s.dtype):
+        s = s.astype(np.float64)
+    elif not pd.api.types.is_object_dtype(s.dtype) and not pd.api.types.is_string_dtype(s.dtype):
+        s = s.astype(object)  # bool, category...: um NaN no lote vira object
+    try:
+        h = pd.util.hash_pandas_object(s, index=False).to_numpy(dtype=np.uint64, copy=True)
+    except TypeError:
+        h = pd.util.hash_pandas_object(s.astype(str), index=False).to_numpy(dtype=np.uint64, copy=True)
+    h[s.isna().to_numpy()] = _NULL_HASH
+    return h
+
+
+def stable_row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """
+    Hash de linha comparável entre lotes lidos separadamente: o mesmo registro tem o
+    mesmo hash mesmo que o lote tenha inferido int64 num e float64 (por um NaN) no outro.
+    """
+    acc = np.zeros(df.shape[0], dtype=np.uint64)
+    for j in range(df.shape[1]):
+        acc *= _HASH_MULT
+        acc ^= _column_hashes(df.iloc[:, j])
+    return acc
+
+
+class RowHashIndex:
+    """
+    Índice de linhas por hash 64-bit: duplicadas, grupos e máscara de remoção em O(n).
+    Com verify=True, linhas marcadas como duplicadas são conferidas contra a primeira
+    ocorrência do grupo; se houver colisão de hash, cai no df.duplicated() exato.
+    """
+
+    def __init__(self, df: pd.DataFrame, verify: bool = True):
+        self.n_rows = int(df.shape[0])
+        self.hashes = row_hashes(df)
+        self.codes, uniques = pd.factorize(self.hashes)
+        self.n_groups = int(len(uniques))
+
+        pos = np.arange(self.n_rows)
+        first = np.full(self.n_groups, self.n_rows, dtype=np.int64)
+        np.minimum.at(first, self.codes, pos)
+        self.first_pos = first
+        self._dup_mask = pos != first[self.codes]
+
+        self.collisions = 0
+        if verify and self._dup_mask.any():
+            self._verify(df)
+
+    def _verify(self, df: pd.DataFrame) -> None:
+        dup_pos = np.flatnonzero(self._dup_mask)
+        ref_pos = self.first_pos[self.codes[dup_pos]]
+        same = np.ones(dup_pos.size, dtype=bool)
+        for j in range(df.shape[1]):
+            col = df.iloc[:, j]
+            a = col.iloc[dup_pos].reset_index(drop=True)
+            b = col.iloc[ref_pos].reset_index(drop=True)
+            try:
+                eq = (a == b) | (a.isna() & b.isna())
+            except Exception:
+                eq = a.astype(str) == b.astype(str)
+            same &= eq.to_numpy(dtype=bool)
+        self.collisions = int((~same).sum())
+        if self.collisions:
+            # colisão de hash (rara): usa o resultado exato
+            self._dup_mask = df.duplicated().to_numpy()
+
+    def duplicated_mask(self) -> np.ndarray:
+        """Equivalente a df.duplicated(keep='first')."""
+        return self._dup_mask
+
+    def duplicate_count(self) -> int:
+        return int(self._dup_mask.sum())
+
+    def duplicate_groups(self, min_size: int = 2) -> list[np.ndarray]:
+        """Posições das linhas de cada grupo de duplicadas (ordenado pela 1ª ocorrência)."""
+        sizes = np.bincount(self.codes, minlength=self.n_groups)
+        groups = np.flatnonzero(sizes >= min_size)
+        if groups.size == 0:
+            return []
+        order = np.argsort(self.codes, kind="stable")
+        bounds = np.concatenate([[0], np.cumsum(sizes)])
+        return [order[bounds[g]: bounds[g + 1]] for g in groups]
+
+    def drop_duplicates(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Equivalente a df.drop_duplicates() para o frame que gerou o índice."""
+        if not self._dup_mask.any():
+            return df
+        return df.loc[~self._dup_mask]
+
+
+def frame_signature(df: pd.DataFrame) -> tuple:
+    """
+    Assinatura barata do frame (forma, colunas, tipos e hash de até 64 linhas espaçadas):
+    invalida caches por id(df) quando o frame é alterado in-place entre chamadas.
+    """
+    n = df.shape[0]
+    pos = np.unique(np.linspace(0, n - 1, min(n, _SIGNATURE_ROWS)).astype(np.int64)) if n else np.empty(0, dtype=np.int64)
+    return (
+        df.shape,
+        tuple(str(c) for c in df.columns),
+        tuple(str(dt) for dt in df.dtypes),
+        row_hashes(df.iloc[pos]).tobytes(),
+    )
+
+
+def row_hash_index(df: pd.DataFrame, verify: bool = True) -> RowHashIndex:
+    """Índice de hashes do frame, construído uma vez e reaproveitado enquanto o frame existir (e não mudar)."""
+    key = id(df)
+    sig = frame_signature(df)
+    hit = _INDEX_CACHE.get(key)
+    if hit is not None and hit[0] == sig:
+        return hit[1]
+    idx = RowHashIndex(df, verify=verify)
+    if key not in _INDEX_CACHE:
+        weakref.finalize(df, _INDEX_CACHE.pop, key, None)
+    _INDEX_CACHE[key] = (sig, idx)
+    return idx
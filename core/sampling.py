@@ -0,0 +1,179 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from core.fingerprint import fingerprint
+
+# Ajustes das amostras (visuais, relatórios e contexto do chat)
+_SEED = 42                   # amostras reprodutíveis
+_TAIL_OUTLIERS = 5           # outliers mais extremos garantidos por coluna numérica
+_TAIL_MAX_SHARE = 0.5        # fração máxima da amostra ocupada por extremos/outliers
+_MIN_PER_STRATUM = 5         # linhas mínimas de cada categoria na estratificada
+_SAMPLE_CACHE_MAX = 16       # amostras guardadas (LRU por fingerprint + parâmetros)
+
+_SAMPLE_CACHE: "OrderedDict[tuple, pd.DataFrame]" = OrderedDict()
+
+
+class RowReservoir:
+    """
+    Amostra uniforme sem reposição de tamanho fixo: cada linha recebe uma chave
+    aleatória e ficam as k menores (combinável entre lotes/partições).
+    """
+
+    def __init__(self, k: int, seed: int | None = _SEED):
+        self.k = int(k)
+        self.rng = np.random.default_rng(seed)
+        self.frame: pd.DataFrame | None = None
+        self.keys = np.empty(0)
+        self.offset = 0  # posição global da próxima linha
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        keys = self.rng.random(len(chunk))
+        chunk = chunk.set_axis(np.arange(self.offset, self.offset + len(chunk)))
+        self.offset += len(chunk)
+        if self.frame is not None and len(self.keys) >= self.k:
+            keep = keys < self.keys.max()
+            chunk, keys = chunk[keep], keys[keep]
+            if len(chunk) == 0:
+                return
+        self._combine(chunk, keys)
+
+    def _combine(self, frame: pd.DataFrame, keys: np.ndarray) -> None:
+        if self.frame is not None:
+            frame = pd.concat([self.frame, frame])
+            keys = np.concatenate([self.keys, keys])
+        if len(keys) > self.k:
+            pick = np.argpartition(keys, self.k)[: self.k]
+            frame, keys = frame.iloc[pick], keys[pick]
+        self.frame, self.keys = frame, keys
+
+    def merge(self, other: "RowReservoir") -> "RowReservoir":
+        if other.frame is not None:
+            self._combine(other.frame.set_axis(other.frame.index + self.offset), other.keys)
+        self.offset += other.offset
+        return self
+
+    def sample(self, k: int | None = None) -> pd.DataFrame:
+        """Amostra em ordem de posição; com k, só as k menores chaves (continua uniforme)."""
+        if self.frame is None:
+            return pd.DataFrame()
+        if k is not None and k < len(self.keys):
+            return self.frame.iloc[np.argsort(self.keys)[:k]].sort_index()
+        return self.frame.sort_index()
+
+
+
+def reservoir_sample(data, k: int, seed: int = _SEED) -> pd.DataFrame:
+    """
+    Amostra uniforme de k linhas numa passada. Aceita DataFrame (mantém o índice)
+    ou um iterável de lotes (ex.: iter_csv_chunks), com índice = posição global.
+    """
+    if isinstance(data, pd.DataFrame):
+        if len(data) <= k:
+            return data
+        # frame em memória: as k menores chaves direto (mesmo sorteio do RowReservoir num lote só)
+        keys = np.random.default_rng(seed).random(len(data))
+        return data.iloc[np.sort(np.argpartition(keys, k)[:k])]
+    res = RowReservoir(k, seed)
+    for chunk in data:
+        res.update(chunk)
+    return res.sample()
+
+
+def stratified_sample(
+    df: pd.DataFrame,
+    by,
+    k: int,
+    min_per_stratum: int = _MIN_PER_STRATUM,
+    seed: int = _SEED,
+) -> pd.DataFrame:
+    """
+    Amostra estratificada pela coluna `by` (NaN é um estrato): cada categoria entra com
+    pelo menos min_per_stratum linhas (ou todas, se tiver menos; o piso cai com muitos estratos) e o restante é
+    proporcional ao tamanho. Categorias raras nunca somem da amostra.
+    """
+    n = len(df)
+    if n <= k:
+        return df
+    codes, _ = pd.factorize(df[by], use_na_sentinel=False)
+    sizes = np.bincount(codes)
+    floor = min(min_per_stratum, max(1, k // sizes.size))  # muitos estratos: piso menor, nunca zero
+    alloc = np.minimum(sizes, floor)
+    rest = k - int(alloc.sum())
+    if rest > 0:
+        spare = sizes - alloc
+        alloc += np.minimum(spare, np.floor(rest * spare / spare.sum()).astype(np.int64))
+    # chave aleatória por linha; dentro de cada estrato ficam as alloc[g] menores
+    keys = np.random.default_rng(seed).random(n)
+    order = np.lexsort((keys, codes))
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    rank = np.arange(n) - starts[codes[order]]
+    pos = order[rank < alloc[codes[order]]]
+    return df.iloc[np.sort(pos)]
+
+
+def tail_sample(
+    df: pd.DataFrame,
+    k: int,
+    outliers_per_col: int = _TAIL_OUTLIERS,
+    seed: int = _SEED,
+) -> pd.DataFrame:
+    """
+    Amostra que garante, em cada coluna numérica, as linhas de mínimo e máximo e os
+    outliers mais extremos (distância à mediana em IQRs, fora das cercas de 1,5 IQR);
+    o restante é uniforme. Extremos ocupam no máximo _TAIL_MAX_SHARE da amostra.
+    """
+    n = len(df)
+    if n <= k:
+        return df
+    extremes, outliers = [], []
+    for c in df.select_dtypes(include=[np.number]).columns:
+        v = df[c].to_numpy(dtype=np.float64, na_value=np.nan)
+        idx = np.flatnonzero(np.isfinite(v))
+        if idx.size == 0:
+            continue
+        vv = v[idx]
+        extremes += [idx[np.argmin(vv)], idx[np.argmax(vv)]]
+        q1, med, q3 = np.percentile(vv, [25, 50, 75])
+        iqr = q3 - q1
+        out = np.flatnonzero((vv < q1 - 1.5 * iqr) | (vv > q3 + 1.5 * iqr))
+        if out.size and outliers_per_col > 0:
+            score = np.abs(vv[out] - med)
+            if out.size > outliers_per_col:
+                out = out[np.argpartition(-score, outliers_per_col - 1)[:outliers_per_col]]
+            outliers.append(idx[out])
+    budget = int(k * _TAIL_MAX_SHARE)
+    must = pd.unique(np.concatenate([np.asarray(extremes, dtype=np.int64), *outliers]))[:budget]  # min/max primeiro
+    rng = np.random.default_rng(seed)
+    free = np.ones(n, dtype=bool)
+    free[must] = False
+    fill = rng.choice(np.flatnonzero(free), k - must.size, replace=False)
+    return df.iloc[np.sort(np.concatenate([must, fill]))]
+
+
+def cached_sample(df: pd.DataFrame, k: int, method: str = "tail", by=None, seed: int = _SEED) -> pd.DataFrame:
+    """
+    Amostra do dataset guardada por (fingerprint, método, k, estrato, seed): visuais,
+    relatórios e chat reaproveitam a mesma amostra em vez de sortear de novo.
+    method: "tail" (extremos garantidos), "stratified" (precisa de `by`) ou "reservoir".
+    """
+    if len(df) <= k:
+        return df
+    key = (fingerprint(df), method, int(k), by, seed)
+    hit = _SAMPLE_CACHE.get(key)
+    if hit is not None:
+        _SAMPLE_CACHE.move_to_end(key)
+        return hit
+    if method == "tail":
+        sample = tail_sample(df, k, seed=seed)
+    elif method == "stratified":
+        sample = stratified_sample(df, by, k, seed=seed)
+    elif method == "reservoir":
+        sample = reservoir_sample(df, k, seed=seed)
+    else:
+        raise ValueError(f"Método de amostragem desconhecido: {method}")
+    _SAMPLE_CACHE[key] = sample
+    while len(_SAMPLE_CACHE) > _SAMPLE_CACHE_MAX:
+        _SAMPLE_CACHE.popitem(last=False)
+    return sample
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+# HyperLogLog: 2^14 registradores (16 KB) -> erro padrão ~1.04/sqrt(2^14) ≈ 0,8%, sem viés
+# em toda a faixa (estimador de Ertl); ~99% das estimativas ficam dentro de ±2,5%
+_HLL_P = 14
+
+
+def hash_values(s: pd.Series) -> np.ndarray:
+    """Hash 64-bit vetorizado dos valores não-nulos (numéricos normalizados p/ float64)."""
+    s = s.dropna()
+    if pd.api.types.is_numeric_dtype(s.dtype) and not pd.api.types.is_bool_dtype(s.dtype):
+        s = s.astype(np.float64)
+    return pd.util.hash_pandas_object(s, index=False).to_numpy(dtype=np.uint64)
+
+
+def _leading_zeros(x: np.ndarray) -> np.ndarray:
+    """
+    Conta zeros à esquerda em uint64 (x >= 2^11). Os 53 bits do topo cabem
+    exatos num float64, então o expoente do frexp dá o bit_length sem loop.
+    """
+    _, exp = np.frexp((x >> np.uint64(11)).astype(np.float64))
+    return (53 - exp).astype(np.uint8)
+
+
+def _sigma(x: float) -> float:
+    """Série sigma do estimador de Ertl (registradores zerados)."""
+    if x == 1.0:
+        return float("inf")
+    y, z = 1.0, x
+    while True:
+        x *= x
+        z_old = z
+        z += x * y
+        y += y
+        if z == z_old:
+            return z
+
+
+def _tau(x: float) -> float:
+    """Série tau do estimador de Ertl (registradores saturados)."""
+    if x == 0.0 or x == 1.0:
+        return 0.0
+    y, z = 1.0, 1.0 - x
+    while True:
+        x = np.sqrt(x)
+        z_old = z
+        y *= 0.5
+        z -= (1.0 - x) ** 2 * y
+        if z == z_old:
+            return z / 3.0
+
+
+class HyperLogLog:
+    """
+    Contador aproximado de distintos, vetorizado e com memória fixa (2^p bytes).
+    Sketches com o mesmo p podem ser combinados (merge), então servem para
+    chunks/partições processados separadamente.
+    """
+
+    def __init__(self, p: int = _HLL_P):
+        self.p = int(p)
+        self.registers = np.zeros(1 << self.p, dtype=np.uint8)
+
+    def add_hashes(self, h: np.ndarray) -> "HyperLogLog":
+        if h.size == 0:
+            return self
+        h = h.astype(np.uint64, copy=False)
+        idx = (h >> np.uint64(64 - self.p)).astype(np.intp)
+        # bit sentinela garante w != 0 e limita rho a 64 - p + 1
+        w = (h << np.uint64(self.p)) | np.uint64(1 << (self.p - 1))
+        rho = _leading_zeros(w) + 1
+        np.maximum.at(self.registers, idx, rho)
+        return self
+
+    def add_series(self, s: pd.Series) -> "HyperLogLog":
+        return self.add_hashes(hash_values(s))
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.p != self.p:
+            raise ValueError("HyperLogLog com precisões diferentes não podem ser combinados")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> int:
+        """
+        Estimador melhorado de Ertl (2017) sobre o histograma dos registradores: sem o
+        degrau entre linear counting e a fórmula bruta (viés de +1 a +3% entre 2,5·m e 5·m)
+        e sem tabelas empíricas do HLL++; erro ~1.04/sqrt(m) em toda a faixa.
+        """
+        m = self.registers.size
+        q = 64 - self.p
+        c = np.bincount(self.registers, minlength=q + 2).astype(np.float64)
+        if c[0] == m:
+            return 0
+        z = m * _tau(1.0 - c[q + 1] / m)
+        for k in range(q, 0, -1):
+            z = 0.5 * (z + c[k])
+        z += m * _sigma(c[0] / m)
+        return int(round(m * m / (2.0 * np.log(2.0)) / z))
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / np.sqrt(self.registers.size)
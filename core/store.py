@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from core.dtypes import optimize_dtypes
+from core.loader import load_csv_bytes
+from core.profiler import DatasetProfile
+
+# Ajustes do cache em disco (Arrow IPC, endereçado pelo conteúdo do CSV)
+_STORE_DIR = os.environ.get(
+    "INSIGHTMIND_STORE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "insightmind", "datasets"),
+)
+_STORE_MAX_BYTES = int(os.environ.get("INSIGHTMIND_STORE_MAX_MB", "2048")) * 1024 * 1024
+_STORE_SUFFIX = ".arrow"
+_PROFILE_SUFFIX = ".profile.json"
+_META_KEY = b"insightmind_meta"
+
+
+def content_key(raw: bytes) -> str:
+    """Hash do conteúdo bruto: o mesmo export reenviado cai na mesma entrada."""
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def _read_raw(uploaded_file) -> bytes:
+    if hasattr(uploaded_file, "seek"):
+        try:
+            uploaded_file.seek(0)
+        except Exception:
+            pass
+    return uploaded_file.read()
+
+
+class DatasetStore:
+    """
+    Guarda cada CSV já parseado como arquivo Arrow IPC (sem compressão) para que
+    leituras seguintes sejam um memory-map, sem reparse. Tamanho total limitado,
+    com remoção LRU (mtime é atualizado a cada acerto).
+    """
+
+    def __init__(self, root: str | None = None, max_bytes: int | None = None):
+        self.root = Path(root or _STORE_DIR)
+        self.max_bytes = _STORE_MAX_BYTES if max_bytes is None else int(max_bytes)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}{_STORE_SUFFIX}"
+
+    def get(self, key: str) -> tuple[pd.DataFrame, dict] | None:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            source = pa.memory_map(str(path), "r")
+            table = pa.ipc.open_file(source).read_all()
+            meta = json.loads((table.schema.metadata or {}).get(_META_KEY, b"{}"))
+            df = table.to_pandas(split_blocks=True)
+        except Exception:
+            # entrada corrompida/incompatível: descarta e trata como miss
+            path.unlink(missing_ok=True)
+            return None
+        os.utime(path)  # LRU: marca como usado agora
+        return df, meta
+
+    def put(self, key: str, df: pd.DataFrame, meta: dict) -> bool:
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowException, TypeError, ValueError):
+            # ex.: coluna object com tipos misturados; segue sem cache
+            return False
+
+        schema_meta = dict(table.schema.metadata or {})
+        schema_meta[_META_KEY] = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+        table = table.replace_schema_metadata(schema_meta)
+
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        os.close(fd)
+        try:
+            with pa.OSFile(tmp, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp, self._path(key))
+        except Exception:
+            Path(tmp).unlink(missing_ok=True)
+            return False
+
+        self._evict()
+        return True
+
+    def _profile_path(self, key: str) -> Path:
+        return self.root / f"{key}{_PROFILE_SUFFIX}"
+
+    def get_profile(self, key: str) -> DatasetProfile | None:
+        path = self._profile_path(key)
+        if not path.exists():
+            return None
+        try:
+            return DatasetProfile.from_json(path.read_text(encoding="utf-8"))
+        except Exception:
+            path.unlink(missing_ok=True)
+            return None
+
+    def put_profile(self, key: str, profile: DatasetProfile) -> None:
+        # perfil acompanha a entrada do dataset (removido junto na evicção)
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        os.close(fd)
+        try:
+            Path(tmp).write_text(profile.to_json(), encoding="utf-8")
+            os.replace(tmp, self._profile_path(key))
+        except Exception:
+            Path(tmp).unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        entries = []
+        for p in self.root.glob(f"*{_STORE_SUFFIX}"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+                total -= size
+                for pp in self.root.glob(f"{p.name[: -len(_STORE_SUFFIX)]}*{_PROFILE_SUFFIX}"):
+                    pp.unlink(missing_ok=True)
+            except OSError:
+                # arquivo ainda mapeado (Windows) ou removido por outro processo
+                continue
+
+    def load_csv(self, uploaded_file, optimize: bool = False) -> tuple[pd.DataFrame, dict]:
+        """Mesma saída de load_csv_smart, mas reaproveitando o parse de uploads idênticos."""
+        raw = _read_raw(uploaded_file)
+        key = content_key(raw)
+
+        hit = self.get(key)
+        if hit is not None:
+            df, meta = hit
+            meta["cache"] = "hit"
+        else:
+            df, meta = load_csv_bytes(raw)
+            meta["content_key"] = key
+            self.put(key, df, meta)
+            meta["cache"] = "miss"
+        meta["content_key"] = key
+
+        # o store guarda o parse "cru"; a compactação é aplicada por cima
+        if optimize:
+            df, info = optimize_dtypes(df)
+            meta.update(info)
+        return df, meta
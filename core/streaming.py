@@ -0,0 +1,478 @@
+import numpy as np
+import pandas as pd
+
+from core.loader import _SNIFF_MIN_CONFIDENCE, sniff_csv_stream, stream_fallback_dialect
+from core.profiler import (
+    DatasetProfile, _MAX_VC_CARDINALITY, _SAMPLE_RECORDS, _TOP_CORR_PAIRS, _TOP_VALUES, _sample_records,
+)
+from core.rowhash import stable_row_hashes
+from core.sampling import _SEED, RowReservoir
+from core.sketches import HyperLogLog, hash_values
+
+# Ajustes do modo streaming (arquivos maiores que a RAM)
+_CHUNK_ROWS = 100_000            # linhas por lote lido do CSV
+_SAMPLE_ROWS = 20_000            # amostra mantida em memória (preview/gráficos)
+_EXACT_ROW_HASHES = 5_000_000    # até aqui duplicadas são exatas; depois, estimativa HLL
+_CORR_MAX_COLS = 200             # numéricas acompanhadas nos co-momentos (estado cresce com k²)
+_CORR_ROW_BLOCK = 16_384         # linhas por produto matricial dos co-momentos
+
+
+def _is_number(dtype) -> bool:
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+
+class ColumnAccumulator:
+    """Estatísticas de uma coluna que podem ser atualizadas por lote e combinadas (merge)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.missing = 0
+        self.dtypes: list = []
+        self.example = None
+        self.distinct = HyperLogLog()
+        # contagens exatas por valor (texto) enquanto a cardinalidade for baixa; None = desistiu
+        self.values: dict | None = {}
+        # momentos (apenas numéricas): n, média, M2 (Welford/Chan), min, max
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def update(self, s: pd.Series) -> None:
+        n_miss = int(s.isna().sum())
+        self.count += int(len(s))
+        self.missing += n_miss
+        if s.dtype not in self.dtypes:
+            self.dtypes.append(s.dtype)
+
+        if self.example is None and n_miss < len(s):
+            self.example = str(s.loc[s.first_valid_index()])
+
+        self.distinct.add_hashes(hash_values(s))
+        if self.values is not None:
+            self._merge_values(s.value_counts(dropna=False))
+
+        if _is_number(s.dtype):
+            v = s.to_numpy(dtype=np.float64, na_value=np.nan)
+            v = v[~np.isnan(v)]
+            if v.size:
+                self._merge_moments(int(v.size), float(v.mean()), float(((v - v.mean()) ** 2).sum()),
+                                    float(v.min()), float(v.max()))
+
+    def _merge_values(self, counts) -> None:
+        if len(counts) > _MAX_VC_CARDINALITY:
+            self.values = None
+            return
+        for k, v in counts.items():
+            key = str(k)
+            self.values[key] = self.values.get(key, 0) + int(v)
+        if len(self.values) > _MAX_VC_CARDINALITY:
+            self.values = None
+
+    def _merge_moments(self, n: int, mean: float, m2: float, vmin: float, vmax: float) -> None:
+        if n == 0:
+            return
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+        self.min = vmin if self.min is None else min(self.min, vmin)
+        self.max = vmax if self.max is None else max(self.max, vmax)
+
+    def merge(self, other: "ColumnAccumulator") -> "ColumnAccumulator":
+        self.count += other.count
+        self.missing += other.missing
+        for dt in other.dtypes:
+            if dt not in self.dtypes:
+                self.dtypes.append(dt)
+        if self.example is None:
+            self.example = other.example
+        self.distinct.merge(other.distinct)
+        if self.values is not None:
+            if other.values is None:
+                self.values = None
+            else:
+                self._merge_values(other.values)
+        self._merge_moments(other.n, other.mean, other.m2,
+                            other.min if other.min is not None else 0.0,
+                            other.max if other.max is not None else 0.0)
+        return self
+
+    @property
+    def dtype(self) -> str:
+        """Tipo final equivalente ao de um parse completo (ex.: int64 + float64 -> float64)."""
+        if not self.dtypes:
+            return "object"
+        if all(_is_number(dt) for dt in self.dtypes):
+            return str(np.result_type(*self.dtypes))
+        if len(self.dtypes) == 1:
+            return str(self.dtypes[0])
+        return "object"
+
+    @property
+    def is_numeric(self) -> bool:
+        return bool(self.dtypes) and all(_is_number(dt) for dt in self.dtypes)
+
+    def n_unique(self) -> int:
+        # nunca mais distintos do que valores não-nulos
+        return min(self.distinct.count(), self.count - self.missing)
+
+    def std(self) -> float:
+        return float(np.sqrt(self.m2 / (self.n - 1))) if self.n > 1 else float("nan")
+
+    def top_values(self, k: int = _TOP_VALUES) -> dict | None:
+        if self.values is None:
+            return None
+        return dict(sorted(self.values.items(), key=lambda kv: -kv[1])[:k])
+
+
+class CoMoments:
+    """
+    Somas pareadas das numéricas (só linhas em que as duas colunas existem), deslocadas
+    pela média do 1º lote para estabilidade: Pearson igual ao df.corr(), combinável por lote.
+    """
+
+    def __init__(self, max_cols: int = _CORR_MAX_COLS):
+        self.max_cols = max_cols
+        self.columns: list = []
+        self.shift = np.empty(0)
+        self.n = np.zeros((0, 0))    # n[i, j]: linhas com i e j presentes
+        self.sx = np.zeros((0, 0))   # sx[i, j]: soma de x_i nessas linhas
+        self.sxx = np.zeros((0, 0))  # sxx[i, j]: soma de x_i² nessas linhas
+        self.sxy = np.zeros((0, 0))  # sxy[i, j]: soma de x_i * x_j
+
+    def _grow(self, cols: list, shift: np.ndarray) -> None:
+        k = len(self.columns) + len(cols)
+        for name in ("n", "sx", "sxx", "sxy"):
+            m = np.zeros((k, k))
+            old = getattr(self, name)
+            m[: old.shape[0], : old.shape[1]] = old
+            setattr(self, name, m)
+        self.columns = self.columns + list(cols)
+        self.shift = np.concatenate([self.shift, shift])
+
+    def update(self, num: pd.DataFrame) -> None:
+        pos = {c: i for i, c in enumerate(self.columns)}
+        room = self.max_cols - len(self.columns)
+        new = [c for c in num.columns if c not in pos][: max(room, 0)]
+        if new:
+            first = num[new].astype(np.float64).mean().fillna(0.0).to_numpy()
+            self._grow(new, first)
+            pos = {c: i for i, c in enumerate(self.columns)}
+        cols = [c for c in num.columns if c in pos]
+        if not cols:
+            return
+        idx = np.array([pos[c] for c in cols])
+        vals = num[cols].to_numpy(dtype=np.float64, na_value=np.nan) - self.shift[idx]
+        for start in range(0, vals.shape[0], _CORR_ROW_BLOCK):
+            x = vals[start: start + _CORR_ROW_BLOCK]
+            m = ~np.isnan(x)
+            x0 = np.where(m, x, 0.0)
+            mf = m.astype(np.float64)
+            ix = np.ix_(idx, idx)
+            self.n[ix] += mf.T @ mf
+            self.sx[ix] += x0.T @ mf
+            self.sxx[ix] += (x0 * x0).T @ mf
+            self.sxy[ix] += x0.T @ x0
+
+    def _reshift(self, shift: np.ndarray) -> None:
+        """Reescreve as somas para outro deslocamento (x - b = (x - a) + (a - b))."""
+        d = self.shift - shift
+        di, dj = d[:, None], d[None, :]
+        sx_t = self.sx.T.copy()
+        self.sxy = self.sxy + di * sx_t + dj * self.sx + di * dj * self.n
+        self.sxx = self.sxx + 2 * di * self.sx + di * di * self.n
+        self.sx = self.sx + di * self.n
+        self.shift = shift.copy()
+
+    def merge(self, other: "CoMoments") -> "CoMoments":
+        pos = {c: i for i, c in enumerate(self.columns)}
+        room = self.max_cols - len(self.columns)
+        new = [c for c in other.columns if c not in pos][: max(room, 0)]
+        if new:
+            other_pos = {c: i for i, c in enumerate(other.columns)}
+            self._grow(new, other.shift[[other_pos[c] for c in new]])
+            pos = {c: i for i, c in enumerate(self.columns)}
+        keep = [i for i, c in enumerate(other.columns) if c in pos]
+        if not keep:
+            return self
+        idx = np.array([pos[other.columns[i]] for i in keep])
+        sub = CoMoments(other.max_cols)
+        sub.columns = [other.columns[i] for i in keep]
+        sub.shift = other.shift[keep]
+        ox = np.ix_(keep, keep)
+        sub.n, sub.sx, sub.sxx, sub.sxy = other.n[ox], other.sx[ox], other.sxx[ox], other.sxy[ox]
+        sub._reshift(self.shift[idx])
+        ix = np.ix_(idx, idx)
+        self.n[ix] += sub.n
+        self.sx[ix] += sub.sx
+        self.sxx[ix] += sub.sxx
+        self.sxy[ix] += sub.sxy
+        return self
+
+    def corr(self) -> pd.DataFrame:
+        n, sx, sxx = self.n, self.sx, self.sxx
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = n * self.sxy - sx * sx.T
+            var_x = n * sxx - sx * sx
+            var_y = var_x.T
+            r = cov / np.sqrt(var_x * var_y)
+        r[(n < 2) | (var_x <= 0) | (var_y <= 0)] = np.nan
+        r = np.clip(r, -1.0, 1.0)
+        return pd.DataFrame(r, index=self.columns, columns=self.columns)
+
+    def top_pairs(self, columns: list | None = None, k: int = _TOP_CORR_PAIRS) -> list[tuple]:
+        """Mesmo formato de profiler._top_correlations: [(a, b, |r|)] em ordem decrescente."""
+        corr = self.corr()
+        if columns is not None:
+            keep = [c for c in corr.columns if c in set(columns)]
+            corr = corr.loc[keep, keep]
+        if corr.shape[1] < 2:
+            return []
+        vals = np.abs(corr.to_numpy(copy=True))
+        vals[np.tril_indices_from(vals)] = np.nan
+        i, j = np.nonzero(~np.isnan(vals))
+        order = np.argsort(-vals[i, j], kind="stable")[:k]
+        cols = corr.columns
+        return [(cols[i[o]], cols[j[o]], float(vals[i[o], j[o]])) for o in order]
+
+
+class RowDuplicateCounter:
+    """
+    Duplicadas por hash de linha: exato até _EXACT_ROW_HASHES, depois estimado via HLL.
+    Os hashes vistos ficam em segmentos ordenados e disjuntos, fundidos como numa LSM
+    (tamanhos decrescentes): cada lote custa O(lote · log total) e não O(total).
+    """
+
+    def __init__(self, max_exact: int = _EXACT_ROW_HASHES):
+        self.max_exact = max_exact
+        self.rows = 0
+        self.exact_dups = 0
+        self.segments: list[np.ndarray] = []
+        self.exact = True
+        self.sketch = HyperLogLog()
+
+    @property
+    def hashes(self) -> np.ndarray:
+        """Todos os hashes vistos (ordenado, sem repetição)."""
+        if not self.segments:
+            return np.empty(0, dtype=np.uint64)
+        return np.sort(np.concatenate(self.segments))
+
+    @property
+    def n_hashes(self) -> int:
+        return int(sum(seg.size for seg in self.segments))
+
+    def _seen(self, h: np.ndarray) -> np.ndarray:
+        seen = np.zeros(h.size, dtype=bool)
+        for seg in self.segments:
+            pos = np.minimum(np.searchsorted(seg, h), seg.size - 1)
+            seen |= seg[pos] == h
+        return seen
+
+    def _add(self, fresh: np.ndarray) -> None:
+        """fresh: ordenado, sem repetição e disjunto dos segmentos."""
+        if fresh.size:
+            self.segments.append(fresh)
+        while len(self.segments) > 1 and self.segments[-2].size <= 2 * self.segments[-1].size:
+            last = self.segments.pop()
+            self.segments[-1] = np.sort(np.concatenate([self.segments[-1], last]))
+        if self.n_hashes > self.max_exact:
+            self.exact = False
+            self.segments = []
+
+    def update(self, chunk: pd.DataFrame) -> np.ndarray:
+        """Conta o lote e devolve a máscara de linhas repetidas (no lote ou em lotes anteriores)."""
+        h = stable_row_hashes(chunk)
+        self.rows += int(h.size)
+        self.sketch.add_hashes(h)
+        dup = pd.Series(h).duplicated().to_numpy(copy=True)
+        if not self.exact:
+            return dup
+        # consultas ordenadas: a busca nos segmentos percorre a memória em sequência
+        order = np.argsort(h)
+        hs = h[order]
+        seen = np.empty(h.size, dtype=bool)
+        seen[order] = self._seen(hs)
+        dup |= seen
+        self.exact_dups += int(dup.sum())
+        fresh = hs[~seen[order]]
+        if fresh.size:
+            fresh = fresh[np.concatenate([[True], fresh[1:] != fresh[:-1]])]  # já ordenado: remove repetidos
+        self._add(fresh)
+        return dup
+
+    def merge(self, other: "RowDuplicateCounter") -> "RowDuplicateCounter":
+        self.sketch.merge(other.sketch)
+        if self.exact and other.exact:
+            theirs = other.hashes
+            seen = self._seen(theirs)
+            self.exact_dups += other.exact_dups + int(seen.sum())
+            self._add(theirs[~seen])
+        else:
+            self.exact = False
+            self.segments = []
+        self.rows += other.rows
+        return self
+
+    def duplicates(self) -> int:
+        if self.exact:
+            return self.exact_dups
+        return max(0, self.rows - min(self.sketch.count(), self.rows))
+
+
+class StreamingProfile:
+    """Perfil de um CSV lido em lotes: mesmas saídas de make_quality_metrics/basic_summary."""
+
+    def __init__(self, sample_rows: int = _SAMPLE_ROWS, seed: int | None = None):
+        self.columns: dict[str, ColumnAccumulator] = {}
+        self.rows = RowDuplicateCounter()
+        # seed=None: chaves do reservoir independentes por partição (merge continua uniforme)
+        self.reservoir = RowReservoir(sample_rows, seed=seed)
+        self.comoments = CoMoments()
+        self.n_rows = 0
+
+    def update(self, chunk: pd.DataFrame) -> np.ndarray:
+        """Soma um lote ao perfil (O(lote)); devolve a máscara de linhas duplicadas do lote."""
+        self.n_rows += int(len(chunk))
+        for c in chunk.columns:
+            acc = self.columns.get(c)
+            if acc is None:
+                acc = self.columns[c] = ColumnAccumulator(c)
+            acc.update(chunk[c])
+        num_cols = [c for c in chunk.columns if _is_number(chunk[c].dtype)]
+        if num_cols:
+            self.comoments.update(chunk[num_cols])
+        dup = self.rows.update(chunk)
+        self.reservoir.update(chunk)
+        return dup
+
+    def merge(self, other: "StreamingProfile") -> "StreamingProfile":
+        self.n_rows += other.n_rows
+        for c, acc in other.columns.items():
+            if c in self.columns:
+                self.columns[c].merge(acc)
+            else:
+                self.columns[c] = acc
+        self.rows.merge(other.rows)
+        self.reservoir.merge(other.reservoir)
+        self.comoments.merge(other.comoments)
+        return self
+
+    @property
+    def sample(self) -> pd.DataFrame:
+        return self.reservoir.sample()
+
+    def quality_metrics(self) -> dict:
+        n_rows, n_cols = self.n_rows, len(self.columns)
+        total_cells = n_rows * n_cols
+        missing = sum(acc.missing for acc in self.columns.values())
+        numeric_cols = [c for c, acc in self.columns.items() if acc.is_numeric]
+        return {
+            "linhas": n_rows,
+            "colunas": n_cols,
+            "missing_total": int(missing),
+            "missing_%": float(missing / total_cells * 100) if total_cells else 0.0,
+            "linhas_duplicadas": int(self.rows.duplicates()) if n_rows else 0,
+            "linhas_duplicadas_exato": bool(self.rows.exact),  # False: estimativa via HLL (acima do limite exato)
+            "colunas_numericas": numeric_cols,
+            "colunas_categoricas": [c for c in self.columns if c not in numeric_cols],
+            "colunas_constantes": [c for c, acc in self.columns.items() if acc.n_unique() <= 1],
+        }
+
+    def summary(self) -> pd.DataFrame:
+        info = []
+        for c, acc in self.columns.items():
+            info.append(
+                {
+                    "coluna": c,
+                    "tipo": acc.dtype,
+                    "% missing": float(acc.missing / acc.count * 100) if acc.count else float("nan"),
+                    "n_unique": acc.n_unique(),
+                    "exemplo": acc.example or "",
+                }
+            )
+        return pd.DataFrame(info)
+
+    def to_profile(self) -> DatasetProfile:
+        """
+        DatasetProfile equivalente ao de profile_dataset (n_unique via HLL, describe sem
+        quartis, linhas de exemplo do reservoir): insights, relatórios e chat funcionam sobre o acumulado sem o DataFrame.
+        """
+        accs = list(self.columns.values())
+        numeric_cols = [acc.name for acc in accs if acc.is_numeric]
+        value_counts = {}
+        for acc in accs:
+            top = None if acc.is_numeric else acc.top_values()
+            if top is not None:
+                value_counts[acc.name] = top
+        return DatasetProfile(
+            n_rows=self.n_rows,
+            columns=[acc.name for acc in accs],
+            dtypes=[acc.dtype for acc in accs],
+            missing=[acc.missing for acc in accs],
+            n_unique=[acc.n_unique() for acc in accs],
+            examples=[acc.example or "" for acc in accs],
+            numeric_cols=numeric_cols,
+            duplicate_rows=int(self.rows.duplicates()) if self.n_rows else 0,
+            distinct_sketches={acc.name: acc.distinct for acc in accs},
+            n_unique_exact=False,
+            top_correlations=self.comoments.top_pairs(numeric_cols),
+            value_counts=value_counts,
+            describe={
+                acc.name: {"count": float(acc.n), "mean": acc.mean if acc.n else float("nan"),
+                           "std": acc.std(), "min": acc.min, "max": acc.max}
+                for acc in accs if acc.is_numeric
+            },
+            sample_records=_sample_records(self.reservoir.sample(_SAMPLE_RECORDS)),
+        )
+
+
+def iter_csv_chunks(f, meta: dict, chunksize: int = _CHUNK_ROWS):
+    """Lê o CSV em lotes de `chunksize` linhas com o dialeto detectado."""
+    reader = pd.read_csv(
+        f,
+        sep=meta["sep"],
+        encoding=meta["encoding"],
+        quotechar=meta["quotechar"],
+        decimal=meta["decimal"],
+        header=meta["header"],
+        chunksize=chunksize,
+    )
+    for chunk in reader:
+        if meta["header"] is None:
+            chunk.columns = [f"coluna_{i + 1}" for i in range(chunk.shape[1])]
+        chunk.columns = [str(c).strip() for c in chunk.columns]
+        yield chunk
+
+
+def profile_csv_stream(
+    source,
+    chunksize: int = _CHUNK_ROWS,
+    sample_rows: int = _SAMPLE_ROWS,
+) -> tuple[StreamingProfile, dict]:
+    """
+    Perfila um CSV (caminho ou arquivo binário com seek) sem carregá-lo inteiro:
+    o pico de memória depende do tamanho do lote e da amostra, não do arquivo.
+    """
+    f = open(source, "rb") if isinstance(source, str) else source
+    try:
+        meta = sniff_csv_stream(f)
+        meta["sniff_method"] = "stream"
+        meta["sniff_low_confidence"] = meta["sniff_confidence"] < _SNIFF_MIN_CONFIDENCE
+        if meta["sniff_low_confidence"]:
+            # mesmo limiar do load_csv_bytes: dialeto refeito com um parse por separador no prefixo
+            stream_fallback_dialect(f, meta)
+            meta["sniff_method"] = "stream-fallback"
+        meta["chunksize"] = int(chunksize)
+        prof = StreamingProfile(sample_rows=sample_rows, seed=_SEED)  # um arquivo só: amostra reprodutível
+        for chunk in iter_csv_chunks(f, meta, chunksize):
+            prof.update(chunk)
+    finally:
+        if isinstance(source, str):
+            f.close()
+    meta["duplicates_exact"] = prof.rows.exact
+    return prof, meta
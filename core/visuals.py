@@ -1,20 +1,279 @@
 import pandas as pd
 import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
+from plotly.colors import hex_to_rgb
+from plotly.subplots import make_subplots
 import streamlit as st
 
+from core.fingerprint import fingerprint
+from core.frequency import frequency_index
+from core.render import _PNG_HEIGHT, _PNG_SCALE, _PNG_WIDTH, render_pngs
+from core.sampling import cached_sample
+
 # Ajustes de performance/segurança
 _MAX_PLOT_ROWS = 20000           # amostra p/ gráficos
 _MAX_NUM_COLS_DIST = 6           # histos no máximo
 _MAX_CAT_COLS = 6                # barras no máximo
 _MAX_CORR_COLS = 25              # correlação no máximo
 _MAX_CAT_CARDINALITY = 200       # se tiver mais que isso, evita plot (muito pesado)
+_HIST_BINS = 40                  # bins dos histogramas (calculados no servidor)
+_MAX_OUTLIER_POINTS = 200        # outliers desenhados no box (os mais extremos de cada lado)
+_DENSITY_BINS = 200              # grade da densidade 2D (bins x bins, independe do nº de linhas)
+_PAIR_BINS = 60                  # grade de cada célula da matriz de pares
+_MAX_PAIR_COLS = 4               # matriz de pares no máximo 4 x 4
+_MAX_DENSITY_CATEGORIES = 10     # cores da densidade por categoria (demais viram "Outros")
+
+
+def numeric_distribution(s: pd.Series, bins: int = _HIST_BINS) -> dict | None:
+    """
+    Histograma e estatísticas de box sobre a coluna inteira (NumPy, no servidor):
+    o gráfico recebe só bins, contagens, quartis, cercas e poucos outliers.
+    """
+    v = s.to_numpy(dtype=np.float64, na_value=np.nan)
+    v = v[np.isfinite(v)]
+    if v.size == 0:
+        return None
+    counts, edges = np.histogram(v, bins=bins)
+    q1, median, q3 = np.percentile(v, [25, 50, 75])
+    iqr = q3 - q1
+    lo_fence, hi_fence = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+    inside = v[(v >= lo_fence) & (v <= hi_fence)]
+    low, high = v[v < lo_fence], v[v > hi_fence]
+    half = _MAX_OUTLIER_POINTS // 2
+    if low.size > half:
+        low = np.partition(low, half - 1)[:half]
+    if high.size > half:
+        high = np.partition(high, high.size - half)[-half:]
+    return {
+        "n": int(v.size),
+        "edges": edges,
+        "counts": counts,
+        "q1": float(q1),
+        "median": float(median),
+        "q3": float(q3),
+        "mean": float(v.mean()),
+        "whisker_low": float(inside.min()) if inside.size else float(q1),
+        "whisker_high": float(inside.max()) if inside.size else float(q3),
+        "n_outliers": int((v < lo_fence).sum() + (v > hi_fence).sum()),
+        "outliers": np.concatenate([low, high]),
+    }
+
+
+def distribution_figure(col, dist: dict) -> go.Figure:
+    """Histograma pré-agregado (barras) + box com estatísticas prontas, no layout do marginal='box'."""
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.2, 0.8], vertical_spacing=0.02)
+    edges = dist["edges"]
+    fig.add_trace(
+        go.Box(
+            y=[str(col)],
+            q1=[dist["q1"]],
+            median=[dist["median"]],
+            q3=[dist["q3"]],
+            mean=[dist["mean"]],
+            lowerfence=[dist["whisker_low"]],
+            upperfence=[dist["whisker_high"]],
+            orientation="h",
+            name=str(col),
+            showlegend=False,
+            hoverinfo="x",
+        ),
+        row=1,
+        col=1,
+    )
+    if dist["outliers"].size:
+        fig.add_trace(
+            go.Scatter(
+                x=dist["outliers"],
+                y=[str(col)] * int(dist["outliers"].size),
+                mode="markers",
+                marker={"size": 4},
+                name="outliers",
+                showlegend=False,
+            ),
+            row=1,
+            col=1,
+        )
+    fig.add_trace(
+        go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=dist["counts"],
+            width=np.diff(edges),
+            name=str(col),
+            showlegend=False,
+        ),
+        row=2,
+        col=1,
+    )
+    fig.update_yaxes(showticklabels=False, row=1, col=1)
+    fig.update_yaxes(title_text="count", row=2, col=1)
+    fig.update_xaxes(title_text=str(col), row=2, col=1)
+    title = f"Distribuição: {col}"
+    if dist["n_outliers"] > dist["outliers"].size:
+        title += f" ({dist['n_outliers']} outliers, {dist['outliers'].size} exibidos)"
+    fig.update_layout(title=title, bargap=0)
+    return fig
+
+
+def _bin_edges(v: np.ndarray, bins: int) -> np.ndarray:
+    lo, hi = float(v.min()), float(v.max())
+    if hi <= lo:
+        lo, hi = lo - 0.5, hi + 0.5
+    return np.linspace(lo, hi, bins + 1)
+
+
+def _bin_index(v: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    bins = edges.size - 1
+    idx = ((v - edges[0]) * (bins / (edges[-1] - edges[0]))).astype(np.int64)
+    np.minimum(idx, bins - 1, out=idx)  # o máximo cai no último bin
+    return idx
+
+
+def density_grid(
+    x: pd.Series,
+    y: pd.Series,
+    bins: int = _DENSITY_BINS,
+    by: pd.Series | None = None,
+    max_categories: int = _MAX_DENSITY_CATEGORIES,
+) -> dict | None:
+    """
+    Binning 2D vetorizado (NumPy, no servidor) sobre todas as linhas: o gráfico recebe só a
+    grade bins x bins, do mesmo tamanho para mil ou 10 milhões de linhas.
+    Com by, também as contagens por categoria (top max_categories + "Outros").
+    """
+    xv = x.to_numpy(dtype=np.float64, na_value=np.nan)
+    yv = y.to_numpy(dtype=np.float64, na_value=np.nan)
+    ok = np.isfinite(xv) & np.isfinite(yv)
+    if not ok.any():
+        return None
+    xv, yv = xv[ok], yv[ok]
+    x_edges, y_edges = _bin_edges(xv, bins), _bin_edges(yv, bins)
+    cell = _bin_index(yv, y_edges) * bins + _bin_index(xv, x_edges)  # linhas = y, colunas = x
+    grid = {
+        "n": int(xv.size),
+        "x_edges": x_edges,
+        "y_edges": y_edges,
+        "counts": np.bincount(cell, minlength=bins * bins).reshape(bins, bins),
+        "categories": None,
+        "counts_by": None,
+    }
+    if by is None:
+        return grid
+
+    labels = by[ok]
+    top = labels.value_counts(dropna=True).index[:max_categories]
+    codes = pd.Categorical(labels, categories=top).codes.astype(np.int64)
+    categories = [str(c) for c in top]
+    if (codes < 0).any():
+        codes[codes < 0] = len(categories)
+        categories.append("Outros")
+    counts_by = np.bincount(codes * (bins * bins) + cell, minlength=len(categories) * bins * bins)
+    grid["categories"] = categories
+    grid["counts_by"] = counts_by.reshape(len(categories), bins, bins)
+    return grid
+
+
+def _centers(edges: np.ndarray) -> np.ndarray:
+    return (edges[:-1] + edges[1:]) / 2
+
+
+def _log_counts(counts: np.ndarray) -> np.ndarray:
+    """log10 das contagens (células vazias transparentes): caudas ralas continuam visíveis."""
+    with np.errstate(divide="ignore"):
+        return np.where(counts > 0, np.log10(np.maximum(counts, 1)).round(3), np.nan)
+
+
+def _category_image(grid: dict) -> np.ndarray:
+    """RGB (bins x bins x 3): mistura das cores das categorias, intensidade pela densidade."""
+    palette = px.colors.qualitative.Plotly
+    colors = np.array([hex_to_rgb(palette[i % len(palette)]) for i in range(len(grid["categories"]))], dtype=np.float64)
+    counts = grid["counts"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        share = grid["counts_by"] / counts  # fração de cada categoria na célula
+    mix = np.einsum("kyx,kc->yxc", np.nan_to_num(share), colors)
+    peak = np.log1p(counts.max())
+    alpha = np.where(counts > 0, 0.25 + 0.75 * np.log1p(counts) / peak, 0.0)[..., None]
+    return (255.0 * (1 - alpha) + mix * alpha).round().astype(np.uint8)
+
+
+def density_figure(x_col, y_col, grid: dict) -> go.Figure:
+    """Densidade 2D como imagem (heatmap da grade); com categorias, cor = mistura das categorias da célula."""
+    x_edges, y_edges = grid["x_edges"], grid["y_edges"]
+    title = f"Densidade: {y_col} x {x_col} ({grid['n']:,} linhas)"
+    if grid["categories"] is None:
+        fig = go.Figure(
+            go.Heatmap(
+                x=_centers(x_edges),
+                y=_centers(y_edges),
+                z=_log_counts(grid["counts"]),
+                customdata=grid["counts"],
+                colorscale="Viridis",
+                colorbar={"title": "log10(linhas)"},
+                hovertemplate=f"{x_col}: %{{x:.4g}}<br>{y_col}: %{{y:.4g}}<br>linhas: %{{customdata}}<extra></extra>",
+            )
+        )
+    else:
+        fig = go.Figure(
+            go.Image(
+                z=_category_image(grid),
+                x0=float(_centers(x_edges)[0]),
+                dx=float(x_edges[1] - x_edges[0]),
+                y0=float(_centers(y_edges)[0]),
+                dy=float(y_edges[1] - y_edges[0]),
+                hoverinfo="skip",
+            )
+        )
+        palette = px.colors.qualitative.Plotly
+        for i, name in enumerate(grid["categories"]):
+            # legenda das cores (a imagem em si não tem legenda)
+            fig.add_trace(
+                go.Scatter(x=[None], y=[None], mode="markers", marker={"color": palette[i % len(palette)], "size": 10}, name=name)
+            )
+        # image trace inverte o eixo y e trava a proporção por padrão
+        fig.update_yaxes(autorange=True, scaleanchor=False)
+        fig.update_xaxes(autorange=True)
+    fig.update_layout(title=title, plot_bgcolor="white")
+    fig.update_xaxes(title_text=str(x_col))
+    fig.update_yaxes(title_text=str(y_col))
+    return fig
 
 
-def _sample_df(df: pd.DataFrame, max_rows: int = _MAX_PLOT_ROWS) -> pd.DataFrame:
-    if df.shape[0] > max_rows:
-        return df.sample(max_rows, random_state=42)
-    return df
+def pair_density_figure(df: pd.DataFrame, cols: list, bins: int = _PAIR_BINS) -> go.Figure:
+    """Matriz de pares: densidades 2D fora da diagonal e histogramas na diagonal, tudo pré-agregado."""
+    cols = list(cols)[:_MAX_PAIR_COLS]
+    k = len(cols)
+    fig = make_subplots(rows=k, cols=k, horizontal_spacing=0.03, vertical_spacing=0.03)
+    for i, cy in enumerate(cols):
+        for j, cx in enumerate(cols):
+            if i == j:
+                dist = numeric_distribution(df[cx], bins=bins)
+                if dist is None:
+                    continue
+                trace = go.Bar(x=_centers(dist["edges"]), y=dist["counts"], width=np.diff(dist["edges"]), showlegend=False)
+            else:
+                grid = density_grid(df[cx], df[cy], bins=bins)
+                if grid is None:
+                    continue
+                trace = go.Heatmap(
+                    x=_centers(grid["x_edges"]),
+                    y=_centers(grid["y_edges"]),
+                    z=_log_counts(grid["counts"]),
+                    coloraxis="coloraxis",
+                    hovertemplate=f"{cx}: %{{x:.4g}}<br>{cy}: %{{y:.4g}}<extra></extra>",
+                )
+            fig.add_trace(trace, row=i + 1, col=j + 1)
+            if i == k - 1:
+                fig.update_xaxes(title_text=str(cx), row=i + 1, col=j + 1)
+            if j == 0:
+                fig.update_yaxes(title_text=str(cy), row=i + 1, col=j + 1)
+    fig.update_layout(
+        title="Matriz de pares (densidade, todas as linhas)",
+        coloraxis={"colorscale": "Viridis", "colorbar": {"title": "log10(linhas)"}},
+        bargap=0,
+        height=220 * k + 80,
+        plot_bgcolor="white",
+    )
+    return fig
 
 
 def render_visuals(df: pd.DataFrame):
@@ -22,7 +281,7 @@ def render_visuals(df: pd.DataFrame):
         st.warning("Dataset vazio. Envie um CSV válido.")
         return
 
-    dff = _sample_df(df)
+    dff = cached_sample(df, _MAX_PLOT_ROWS)  # extremos e outliers garantidos; reaproveitada entre reruns
 
     num = dff.select_dtypes(include=[np.number])
     cat = dff.select_dtypes(exclude=[np.number])
@@ -34,14 +293,12 @@ def render_visuals(df: pd.DataFrame):
         st.markdown("#### 🔥 Distribuições (Top numéricas)")
         for c in list(num.columns[:_MAX_NUM_COLS_DIST]):
             try:
-                fig = px.histogram(
-                    dff,
-                    x=c,
-                    marginal="box",
-                    nbins=40,
-                    title=f"Distribuição: {c}",
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                # Agregado no servidor sobre todas as linhas (não só a amostra)
+                dist = numeric_distribution(df[c])
+                if dist is None:
+                    st.info(f"**{c}** não tem valores numéricos para plotar.")
+                    continue
+                st.plotly_chart(distribution_figure(c, dist), use_container_width=True)
             except Exception as e:
                 st.warning(f"Não consegui plotar **{c}**: {e}")
 
@@ -60,6 +317,28 @@ def render_visuals(df: pd.DataFrame):
                 st.plotly_chart(fig, use_container_width=True)
             except Exception as e:
                 st.warning(f"Não consegui gerar correlação: {e}")
+
+        if num.shape[1] >= 2:
+            st.markdown("#### 🌌 Densidade 2D (todas as linhas)")
+            try:
+                num_cols = list(num.columns)
+                c1, c2, c3 = st.columns(3)
+                x_col = c1.selectbox("Eixo X", num_cols, index=0, key="density_x")
+                y_col = c2.selectbox("Eixo Y", num_cols, index=1, key="density_y")
+                by_col = c3.selectbox("Cor por categoria", ["(nenhuma)"] + list(cat.columns), key="density_by")
+                # Binning no servidor sobre o df inteiro: payload fixo (bins x bins)
+                grid = density_grid(df[x_col], df[y_col], by=None if by_col == "(nenhuma)" else df[by_col])
+                if grid is None:
+                    st.info("Sem pares de valores numéricos para plotar.")
+                else:
+                    st.plotly_chart(density_figure(x_col, y_col, grid), use_container_width=True)
+
+                if num.shape[1] >= 3 and st.checkbox(
+                    f"Matriz de pares (primeiras {_MAX_PAIR_COLS} numéricas)", key="density_pairs"
+                ):
+                    st.plotly_chart(pair_density_figure(df, num_cols[:_MAX_PAIR_COLS]), use_container_width=True)
+            except Exception as e:
+                st.warning(f"Não consegui gerar a densidade 2D: {e}")
     else:
         st.info("Não há colunas numéricas para gerar distribuições/correlação.")
 
@@ -68,22 +347,17 @@ def render_visuals(df: pd.DataFrame):
     # ----------------------------
     if cat.shape[1] > 0:
         st.markdown("#### 🧩 Categóricas (Top colunas)")
+        # cardinalidade e contagens do dataset inteiro, uma varredura por coluna (em cache)
+        freq = frequency_index(df)
         for c in list(cat.columns[:_MAX_CAT_COLS]):
             try:
                 # evita travar em cardinalidade absurda
-                nun = int(df[c].nunique(dropna=True))  # usa df original p/ cardinalidade real
+                nun = freq.n_unique(c)
                 if nun > _MAX_CAT_CARDINALITY:
                     st.info(f"**{c}** tem alta cardinalidade ({nun} únicos). Pulando gráfico de categorias.")
                     continue
 
-                vc = (
-                    dff[c]
-                    .astype(str)
-                    .value_counts(dropna=False)
-                    .head(20)
-                    .reset_index()
-                )
-                vc.columns = [c, "count"]
+                vc = freq[c].top_frame(20)
 
                 fig = px.bar(vc, x=c, y="count", title=f"Top categorias: {c}")
                 st.plotly_chart(fig, use_container_width=True)
@@ -93,40 +367,57 @@ def render_visuals(df: pd.DataFrame):
         st.info("Não há colunas categóricas para gerar gráficos.")
 
 
-def build_report_figures(df: pd.DataFrame) -> list[bytes]:
+def _corr_figure(dff: pd.DataFrame, corr_cols: list) -> go.Figure:
+    corr = dff[corr_cols].corr(numeric_only=True)
+    return px.imshow(
+        corr,
+        text_auto=True,
+        title=f"Matriz de Correlação (numéricas) — até {_MAX_CORR_COLS} colunas",
+    )
+
+
+def _report_distribution_figure(df: pd.DataFrame, c) -> go.Figure | None:
+    dist = numeric_distribution(df[c])
+    return None if dist is None else distribution_figure(c, dist)
+
+
+def build_report_figures(
+    df: pd.DataFrame,
+    width: int = _PNG_WIDTH,
+    height: int = _PNG_HEIGHT,
+    scale: float = _PNG_SCALE,
+) -> list[bytes]:
     """
-    Retorna lista de PNGs (bytes). Requer kaleido para fig.to_image().
-    Otimizado para não travar com datasets grandes.
+    Retorna lista de PNGs (bytes). Requer kaleido para a exportação.
+    Render em paralelo num pool persistente; PNGs em cache por fingerprint + gráfico + coluna,
+    então o mesmo relatório sai de novo sem renderizar nada.
     """
     figs: list[bytes] = []
     if df is None or df.empty:
         return figs
 
-    dff = _sample_df(df, max_rows=_MAX_PLOT_ROWS)
+    fp = fingerprint(df)
+    dff = cached_sample(df, _MAX_PLOT_ROWS)
 
     num = dff.select_dtypes(include=[np.number])
 
+    jobs, labels = [], []
     # Correlação (limitada)
     if num.shape[1] >= 2:
-        try:
-            corr_cols = list(num.columns[:_MAX_CORR_COLS])
-            corr = dff[corr_cols].corr(numeric_only=True)
-            fig = px.imshow(
-                corr,
-                text_auto=True,
-                title=f"Matriz de Correlação (numéricas) — até {_MAX_CORR_COLS} colunas",
-            )
-            figs.append(fig.to_image(format="png", width=1200, height=900, scale=2))
-        except Exception as e:
-            # comum: kaleido ausente
-            st.warning(f"Não consegui exportar correlação para PNG (verifique 'kaleido'): {e}")
+        corr_cols = list(num.columns[:_MAX_CORR_COLS])
+        jobs.append(((fp, "corr", tuple(corr_cols)), lambda: _corr_figure(dff, corr_cols)))
+        labels.append("correlação")
 
     # Histogramas (limitado)
     for c in list(num.columns[:2]):
-        try:
-            fig = px.histogram(dff, x=c, marginal="box", nbins=40, title=f"Distribuição: {c}")
-            figs.append(fig.to_image(format="png", width=1200, height=900, scale=2))
-        except Exception as e:
-            st.warning(f"Não consegui exportar histograma {c} para PNG (verifique 'kaleido'): {e}")
+        jobs.append(((fp, "hist", c), lambda c=c: _report_distribution_figure(df, c)))
+        labels.append(f"histograma {c}")
+
+    for label, png in zip(labels, render_pngs(jobs, width=width, height=height, scale=scale)):
+        if isinstance(png, Exception):
+            # comum: kaleido ausente
+            st.warning(f"Não consegui exportar {label} para PNG (verifique 'kaleido'): {png}")
+        elif png is not None:
+            figs.append(png)
 
     return figs
@@ -0,0 +1,19 @@
+import numpy as np
+import pandas as pd
+
+from core.cleaning import CleaningPlan
+from core.incremental import IncrementalDataset
+
+
+def test_append_drops_rows_seen_in_earlier_batch_after_dtype_change():
+    # lote 2 repete (1,'a') e (2,'b'); um NaN em `a` faz o lote 2 ser lido como float64
+    batch1 = pd.DataFrame({"a": [1, 2, 3], "b": ["a", "b", "c"]})
+    batch2 = pd.DataFrame({"a": [1.0, 2.0, np.nan], "b": ["a", "b", "d"]})
+    ds = IncrementalDataset(plan=CleaningPlan(impute_numeric="none", outlier_clip=False))
+
+    ds.append(batch1)
+    delta, log = ds.append(batch2)
+
+    assert ds.quality_metrics()["linhas_duplicadas"] == 2
+    assert len(delta) == 1
+    assert "Removidas duplicadas: 2 linhas." in log